@@ -0,0 +1,62 @@
+"""
+Microbenchmark for bot.media_links against the old per-call regex + substring checks.
+
+    python -m benchmarks.bench_media_links
+"""
+# Standard Library
+import re
+import timeit
+
+# Local
+from bot.media_links import parse_media_link
+
+SAMPLES = [
+    "never gonna give you up - rick astley",
+    "https://open.spotify.com/track/4cOdK2wGLETKBW3PvgPWqT?si=0123456789abcdef",
+    "https://open.spotify.com/intl-de/track/4cOdK2wGLETKBW3PvgPWqT",
+    "spotify:track:4cOdK2wGLETKBW3PvgPWqT",
+    "https://open.spotify.com/album/1ATL5GLyefJaxhQzSPVrLX",
+    "https://spotify.link/AbCdEf1234",
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=42s",
+    "https://youtu.be/dQw4w9WgXcQ",
+    "https://m.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://www.youtube.com/shorts/dQw4w9WgXcQ",
+    "https://example.com/some/page",
+]
+
+OLD_URL_REGEX = (
+    r"(?i)\b("
+    r"(?:https?://|www\d{0,3}[.]|[a-z0-9.\-]+[.][a-z]{2,4}/)"
+    r"(?:[^\s()<>]+|\(([^\s()<>]+|(\([^\s()<>]+\)))*\))+"
+    r"(?:\(([^\s()<>]+|(\([^\s()<>]+\)))*\)|"
+    r"[^\s`!()\[\]{};:'\".,<>?«»“”‘’]))"
+)
+
+
+def old_classify(text):
+    """What songrequest_command + is_valid_media_url used to do, minus the network calls."""
+    if not re.match(OLD_URL_REGEX, text):
+        return "text"
+    if "spotify" in text and not re.match(
+            r"^(https:\/\/open.spotify.com\/track\/|spotify:track:)([a-zA-Z0-9]+)(\?.*)?$", text):
+        return "invalid"
+    if "youtu" in text and not re.match(
+            r"^(https?:\/\/)?(www\.|m\.)?(youtube\.com\/watch\?v=|youtu\.be\/)([\w\-]+)(\?.*)?$", text):
+        return "invalid"
+    return "url"
+
+
+def main(number=20000):
+    for name, func in (("old", old_classify), ("media_links", parse_media_link)):
+        seconds = timeit.timeit(lambda: [func(sample) for sample in SAMPLES], number=number)
+        per_call = seconds / (number * len(SAMPLES)) * 1e6
+        print(f"{name:>12}: {per_call:.2f} us per classification")
+
+    print()
+    for sample in SAMPLES:
+        link = parse_media_link(sample)
+        print(f"{link.kind.value:>20} {str(link.id):>24}  {sample}")
+
+
+if __name__ == "__main__":
+    main()
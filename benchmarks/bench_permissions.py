@@ -0,0 +1,71 @@
+"""
+Microbenchmark for command permission checks: the old model_dump() + loop against compiled role masks.
+
+    python -m benchmarks.bench_permissions
+"""
+# Standard Library
+import timeit
+
+# Local
+from bot.permissions import chatter_mask, compile_permissions
+from ui.models.config import Config
+
+
+class Author:
+    def __init__(self, name, badges):
+        self.name = name
+        self.badges = badges
+
+
+AUTHORS = [
+    Author("viewer", {}),
+    Author("subscriber", {"subscriber": "12"}),
+    Author("vip", {"vip": "1", "subscriber": "3"}),
+    Author("mod", {"moderator": "1"}),
+    Author("channel", {"broadcaster": "1"}),
+]
+COMMANDS = ["ping_command", "np_command", "songrequest_command"]
+
+
+def old_check(config, author, command_name):
+    """Bot._check_permissions before the masks."""
+    command_perms = config.permissions.model_dump()[command_name]['permission_config']
+    allow_all = command_perms['unsubbed']
+    for permission in command_perms:
+        if command_perms[permission]:
+            if (permission in author.badges) or allow_all:
+                return True
+    return False
+
+
+def main(number=20000):
+    config = Config(channel="channel")
+    masks = compile_permissions(config.permissions)
+    checks = len(AUTHORS) * len(COMMANDS)
+
+    def old():
+        for author in AUTHORS:
+            for command_name in COMMANDS:
+                old_check(config, author, command_name)
+
+    def per_message():
+        # what a command costs now: one badge mask for the message, then the AND
+        for author in AUTHORS:
+            author_mask = chatter_mask(author, config.channel)
+            for command_name in COMMANDS:
+                masks[command_name] & author_mask
+
+    for name, func in (("old", old), ("masks", per_message)):
+        seconds = timeit.timeit(func, number=number // 10)
+        print(f"{name:>12}: {seconds / (number // 10 * checks) * 1e6:.3f} us per check")
+
+    print()
+    for author in AUTHORS:
+        author_mask = chatter_mask(author, config.channel)
+        allowed = [command_name for command_name in COMMANDS if masks[command_name] & author_mask]
+        old_allowed = [command_name for command_name in COMMANDS if old_check(config, author, command_name)]
+        print(f"{author.name:>12}: now {allowed}, before {old_allowed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Startup benchmark: cold import time per module, time to the first window and time until the bot is ready to
+connect. Every measurement runs in a fresh interpreter, so nothing is already imported.
+
+    python -m benchmarks.bench_startup
+
+The window needs customtkinter and a display, it's skipped when either is missing. "Ready" is Bot() built and
+about to connect, the Twitch/Spotify network round trips aren't included.
+"""
+# Standard Library
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# what the GUI needs before its window shows, then what only the bot needs
+MODULES = [
+    "constants",
+    "ui.models.config",
+    "bot.config_service",
+    "bot.blacklists",
+    "bot.request_log",
+    "ui.main_app",
+    "bot.scrypt_tunes",
+]
+HEAVY = ["spotipy", "twitchio", "aiohttp", "urllib3", "requests", "rich"]
+
+IMPORT_PROBE = """
+import sys, time
+t = time.perf_counter()
+import {module}
+print(time.perf_counter() - t)
+print(" ".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+WINDOW_PROBE = """
+import time
+t = time.perf_counter()
+from ui.main_app import MainApp
+imported = time.perf_counter()
+app = MainApp()
+app.update()
+shown = time.perf_counter()
+app.destroy()
+print(imported - t)
+print(shown - t)
+"""
+
+READY_PROBE = """
+import asyncio, time
+t = time.perf_counter()
+from bot.scrypt_tunes import Bot
+imported = time.perf_counter()
+asyncio.set_event_loop(asyncio.new_event_loop())
+Bot()
+ready = time.perf_counter()
+print(imported - t)
+print(ready - t)
+"""
+
+
+def run(code: str, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args, "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=120
+    )
+
+
+def slowest_imports(module: str, n: int = 5) -> list:
+    """:return: list: (ms, name) of the slowest top level dependencies of a module, from -X importtime"""
+    # the marker separates the module's imports from the ones the interpreter does at startup (site, .pth files)
+    result = run(f"import sys; print('--', file=sys.stderr, flush=True); import {module}", "-X", "importtime")
+    times = []
+    for line in result.stderr.split("--\n", 1)[-1].splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # indent of two spaces = imported directly by the module
+        if name.startswith("   ") and not name.startswith("    "):
+            times.append((int(cumulative) / 1000, name.strip()))
+    return sorted(times, reverse=True)[:n]
+
+
+def error(result: subprocess.CompletedProcess) -> str:
+    lines = result.stderr.strip().splitlines()
+    return lines[-1] if lines else f"exit code {result.returncode}"
+
+
+def main(repeat=3):
+    print(f"cold imports, best of {repeat}")
+    for module in MODULES:
+        results = [run(IMPORT_PROBE.format(module=module, heavy=HEAVY)) for _ in range(repeat)]
+        if any(result.returncode for result in results):
+            print(f"{module:>20}: skipped, {error(next(r for r in results if r.returncode))}")
+            continue
+        seconds = min(float(result.stdout.split("\n")[0]) for result in results)
+        heavy = results[0].stdout.split("\n")[1].strip() or "-"
+        print(f"{module:>20}: {seconds * 1000:7.1f} ms   heavy deps loaded: {heavy}")
+        for ms, name in slowest_imports(module):
+            print(f"{'':>24}{ms:7.1f} ms  {name}")
+
+    print()
+    result = run(WINDOW_PROBE)
+    if result.returncode:
+        print(f"{'first window':>20}: skipped, {error(result)}")
+    else:
+        imported, shown = (float(value) for value in result.stdout.split())
+        print(f"{'first window':>20}: {shown * 1000:7.1f} ms ({imported * 1000:.1f} ms of it imports)")
+
+    result = run(READY_PROBE)
+    if result.returncode:
+        print(f"{'bot ready':>20}: skipped, {error(result)}")
+    else:
+        imported, ready = (float(value) for value in result.stdout.split())
+        print(f"{'bot ready':>20}: {ready * 1000:7.1f} ms ({imported * 1000:.1f} ms of it imports)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Headless ScryptTunes: runs the bot without the GUI (and without importing customtkinter), e.g. on a server
+under systemd or another process supervisor.
+
+    python -m bot
+
+Settings are read from the same config.json the GUI writes. SIGTERM / SIGINT shut the bot down cleanly
+(blacklists, caches and rate limit state are saved) and the process exits 0.
+"""
+# Standard Library
+import asyncio
+import json
+import logging
+import os
+import signal
+import sys
+
+# Local
+import constants
+from bot.log_pipeline import start_logging
+
+
+def console_handler() -> logging.Handler:
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+    return handler
+
+
+def ensure_config() -> bool:
+    """:return: bool: False if there was no config yet and a default one was written for the user to fill in"""
+    if os.path.exists(constants.CONFIG):
+        return True
+
+    # Local
+    from bot.persistence import atomic_write
+    from ui.models.config import Config
+
+    atomic_write(constants.CONFIG, json.dumps(Config().model_dump(), indent=4))
+    logging.error(f"No config found, wrote a default one to {constants.CONFIG}. Fill it in and start again.")
+    return False
+
+
+def main() -> int:
+    constants.ensure_data_dirs()
+    start_logging(console=console_handler())
+    logging.info(f"ScryptTunes headless, data in {constants.SCRYPTTUNES_DATA_CONFIG}")
+    if not ensure_config():
+        return 1
+
+    # Local
+    from bot.scrypt_tunes import Bot
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    bot = Bot()
+
+    def shutdown(signum, frame=None):
+        logging.info(f"Received {signal.Signals(signum).name}, shutting down")
+        # Bot.run() closes the bot (and saves its state) once run_forever returns
+        loop.call_soon_threadsafe(loop.stop)
+
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(signum, shutdown, signum)
+        except (NotImplementedError, AttributeError):
+            signal.signal(signum, shutdown)  # Windows has no loop signal handlers
+
+    try:
+        bot.run()
+    finally:
+        loop.close()
+    logging.info("ScryptTunes stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
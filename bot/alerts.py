@@ -0,0 +1,214 @@
+# Standard Library
+import asyncio
+import datetime
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Third-Party
+import aiohttp
+
+# Local
+from bot.config_service import ConfigService
+from bot.models.discord import Author, DiscordWebhook, Embed, Footer
+from ui.models.config import AlertConfig
+
+MAX_EMBEDS = 10  # per webhook message, Discord's limit
+MAX_DESCRIPTION = 4000  # Discord allows 4096
+ALERT_COLOR = 0xE74C3C
+
+
+def error_summary(e: BaseException) -> str:
+    """
+    Exception type and HTTP status, e.g. "SpotifyException 503". Used as the alert's error instead of str(e),
+    which for Spotify errors holds the request URL (track IDs, search text) and would make every alert unique.
+    """
+    status = getattr(e, "http_status", None) or getattr(e, "status", None)
+    return f"{type(e).__name__} {status}" if status else type(e).__name__
+
+
+class Alert:
+    def __init__(self, key: Tuple[str, str], title: str, description: str, author: Optional[str] = None):
+        self.key = key
+        self.title = title
+        self.description = description
+        self.author = author
+        self.opened_at = time.monotonic()
+        self.count = 1  # occurrences in the current window
+        self.sent = 0  # occurrences already reported
+
+    def embed(self, title: str, count: int) -> Embed:
+        description = self.description
+        if len(description) > MAX_DESCRIPTION:
+            # the end of a stack trace is the useful part
+            description = "..." + description[-MAX_DESCRIPTION:]
+        return Embed(
+            author=Author(name=self.author) if self.author else None,
+            title=(title if count == 1 else f"{title} (x{count})")[:256],
+            description=description,
+            color=ALERT_COLOR,
+            timestamp=datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        )
+
+
+class AlertDispatcher:
+    """
+    Sends error alerts to the Discord webhook from the config without ever holding up a command.
+
+    alert() only touches memory: the alert goes on a bounded queue and a background task posts it. Identical
+    alerts (same title and error) within dedup_window are collapsed, the first one is sent right away and the
+    repeats are reported as one follow-up with a count when the window closes. Alerts that arrive together are
+    batched into one message, and Discord's rate limit headers and 429s are honoured. If the queue is full
+    (Discord unreachable during a long outage) new alerts are dropped and logged.
+    """
+
+    def __init__(self, config_service: ConfigService, max_queue: int = 100, batch_delay: float = 2.0,
+                 timeout: float = 10, max_retries: int = 3):
+        self.config_service = config_service
+        self.batch_delay = batch_delay
+        self.timeout = timeout
+        self.max_retries = max_retries
+
+        self.queue = asyncio.Queue(maxsize=max_queue)  # type: asyncio.Queue
+        self.dropped = 0
+        self._open = {}  # type: Dict[Tuple[str, str], Alert]
+        self._session = None  # type: Optional[aiohttp.ClientSession]
+        self._task = None  # type: Optional[asyncio.Task]
+
+    @property
+    def config(self) -> AlertConfig:
+        return self.config_service.config.alerts
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self._session
+
+    def alert(self, title: str, error: str, details: str = "", author: Optional[str] = None):
+        """
+        Report an error. Never blocks or raises. Call from the bot's event loop.
+
+        :param title: what failed and where, e.g. "Song Request Error in x's Channel"
+        :param error: short error summary (see error_summary), alerts with the same title and error are deduplicated
+        :param details: the full error message and stack trace, taken from the first occurrence
+        :param author: chatter whose command hit the error
+        """
+        if not self.config.webhook_url:
+            return
+
+        key = (title, error)
+        entry = self._open.get(key)
+        if entry is not None:
+            entry.count += 1
+            return
+
+        entry = Alert(key, title, f"Error: {error}\n{details}".strip(), author)
+        try:
+            self.queue.put_nowait((entry, None))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped == 1:  # once per overflow, not once per alert
+                logging.warning(f"Alert queue full, dropping alerts until it drains: {title}: {error}")
+            return
+        self._open[key] = entry
+        self.start()
+
+    def _close_windows(self):
+        """Report repeats for every dedup window that has ended, then forget those alerts."""
+        window = self.config.dedup_window
+        now = time.monotonic()
+        for key, entry in list(self._open.items()):
+            if not entry.sent or now - entry.opened_at < window:
+                continue  # still queued, or still collecting repeats
+            del self._open[key]
+            repeats = entry.count - entry.sent
+            if repeats > 0:
+                span = f"{window // 60} min" if window >= 60 else f"{window}s"
+                title = f"{entry.title}, repeated {repeats} more times in {span}"
+                try:
+                    self.queue.put_nowait((entry, title))
+                except asyncio.QueueFull:
+                    self.dropped += 1
+
+    def _next_deadline(self) -> Optional[float]:
+        """:return: float: seconds until the next dedup window ends, None if none is open"""
+        sent = [entry.opened_at for entry in self._open.values() if entry.sent]
+        if not sent:
+            return None
+        return max(min(sent) + self.config.dedup_window - time.monotonic(), 0.1)
+
+    async def _run(self):
+        while True:
+            self._close_windows()
+            try:
+                first = await asyncio.wait_for(self.queue.get(), self._next_deadline())
+            except asyncio.TimeoutError:
+                continue
+
+            # give a burst a moment to arrive so it goes out as one message
+            await asyncio.sleep(self.batch_delay)
+            batch = [first]
+            while len(batch) < MAX_EMBEDS and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            embeds = []
+            for entry, summary in batch:
+                if summary is None:
+                    # first occurrence, plus any repeats that came in while it waited
+                    embeds.append(entry.embed(entry.title, entry.count))
+                    entry.sent = entry.count
+                else:
+                    embeds.append(entry.embed(summary, 1))
+            try:
+                await self._post(embeds)
+            except Exception as e:
+                logging.warning(f"Couldn't send {len(embeds)} alert(s) to Discord: {e}")
+
+    async def _post(self, embeds: List[Embed]):
+        config = self.config
+        if not config.webhook_url:
+            return
+        webhook = DiscordWebhook(
+            content=f"{config.mention} WE HAVE A PROBLEM".strip(),
+            username="Scrypt",
+            avatar_url="https://stux.ai/static/cryy.png",
+            embeds=embeds,
+        )
+        if self.dropped:
+            webhook.embeds[-1].footer = Footer(text=f"{self.dropped} alert(s) dropped, the queue was full")
+            self.dropped = 0
+
+        for attempt in range(self.max_retries + 1):
+            async with self._get_session().post(config.webhook_url, json=webhook.payload()) as response:
+                if response.status == 429:
+                    # https://discord.com/developers/docs/topics/rate-limits
+                    try:
+                        retry_after = float((await response.json()).get("retry_after", 1))
+                    except (ValueError, aiohttp.ContentTypeError):
+                        retry_after = float(response.headers.get("Retry-After", 1))
+                    if attempt == self.max_retries:
+                        response.raise_for_status()
+                    logging.info(f"Discord rate limited the alert webhook, retrying in {retry_after:.1f}s")
+                    await asyncio.sleep(retry_after)
+                    continue
+                response.raise_for_status()
+
+                # bucket used up, wait for it to reset before the next message
+                if response.headers.get("X-RateLimit-Remaining") == "0":
+                    await asyncio.sleep(float(response.headers.get("X-RateLimit-Reset-After", 1)))
+                return
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._session is not None:
+            await self._session.close()
@@ -0,0 +1,178 @@
+# Standard Library
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Optional
+
+# Third-Party
+import aiohttp
+import requests
+from spotipy.cache_handler import CacheFileHandler
+from spotipy.exceptions import SpotifyException
+from spotipy.oauth2 import SpotifyOAuth, SpotifyOauthError
+
+# Local
+from bot.persistence import atomic_write
+
+
+class AtomicCacheFileHandler(CacheFileHandler):
+    """
+    spotipy token cache that keeps the token in memory. The cache file is read once and every write is atomic,
+    so a crash mid-refresh can't leave a truncated .cache behind.
+    """
+
+    def __init__(self, cache_path: str):
+        super().__init__(cache_path=cache_path)
+        self._token_info = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def get_cached_token(self):
+        with self._lock:
+            if not self._loaded:
+                self._token_info = super().get_cached_token()
+                self._loaded = True
+            return dict(self._token_info) if self._token_info else None
+
+    def save_token_to_cache(self, token_info):
+        with self._lock:
+            self._token_info = dict(token_info)
+            self._loaded = True
+        try:
+            atomic_write(self.cache_path, json.dumps(token_info, cls=self.encoder_cls), mode=0o600)
+        except OSError as e:
+            logging.warning(f"Couldn't write Spotify token to cache at {self.cache_path}: {e}")
+
+
+class SpotifyTokenManager:
+    """
+    Keeps the Spotify access token in memory and refreshes it in a background task `refresh_margin` seconds
+    before it expires, so chat commands never wait on a token refresh or the cache file.
+
+    get_token() only refreshes inline if the background refresh hasn't managed to (e.g. Spotify was unreachable).
+    A failed refresh raises SpotifyException 503.
+    """
+
+    def __init__(self, auth_manager: SpotifyOAuth, refresh_margin: float = 300, retry_delay: float = 30):
+        self.auth_manager = auth_manager
+        self.refresh_margin = refresh_margin
+        self.retry_delay = retry_delay
+
+        self._token_info = None  # type: Optional[dict]
+        self._lock = None  # type: Optional[asyncio.Lock]
+        self._task = None  # type: Optional[asyncio.Task]
+
+    @staticmethod
+    def _expires_in(token_info: dict) -> float:
+        return token_info["expires_at"] - time.time()
+
+    async def get_token(self) -> str:
+        token_info = self._token_info
+        if token_info is None or self._expires_in(token_info) <= 60:
+            token_info = await self._refresh(force=token_info is not None)
+        return token_info["access_token"]
+
+    async def _refresh(self, force: bool) -> dict:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            # another caller may have refreshed while we waited for the lock
+            if self._token_info is not None and self._expires_in(self._token_info) > self.refresh_margin:
+                return self._token_info
+            loop = asyncio.get_running_loop()
+            try:
+                self._token_info = await loop.run_in_executor(None, self._fetch_token, force)
+            except (requests.exceptions.RequestException, SpotifyOauthError) as e:
+                # as a 503 the commands report it like any other Spotify error and RetryPolicy retries it
+                raise SpotifyException(503, -1, f"Spotify token refresh failed: {e}") from e
+            return self._token_info
+
+    def _fetch_token(self, force: bool) -> dict:
+        # runs in a worker thread, spotipy does blocking http and (on first login) waits for the browser redirect
+        token_info = self.auth_manager.validate_token(self.auth_manager.cache_handler.get_cached_token())
+        if token_info is None:
+            self.auth_manager.get_access_token(as_dict=False)
+            return self.auth_manager.cache_handler.get_cached_token()
+        if force or self._expires_in(token_info) <= self.refresh_margin:
+            token_info = self.auth_manager.refresh_access_token(token_info["refresh_token"])
+        return token_info
+
+    async def _refresh_loop(self):
+        while True:
+            if self._token_info is not None:
+                await asyncio.sleep(max(self._expires_in(self._token_info) - self.refresh_margin, 0))
+            try:
+                await self._refresh(force=self._token_info is not None)
+                logging.debug(f"Spotify token refreshed, expires in {self._expires_in(self._token_info):.0f}s")
+            except Exception as e:
+                logging.warning(f"Spotify token refresh failed, retrying in {self.retry_delay:.0f}s: {e}")
+                await asyncio.sleep(self.retry_delay)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._refresh_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+class TwitchTokenMonitor:
+    """
+    Validates the Twitch chat token in the background (Twitch asks apps to do this hourly) and warns ahead of
+    expiry. Tokens pasted from a generator have no refresh token, so this can only warn, not refresh.
+    """
+
+    VALIDATE_URL = "https://id.twitch.tv/oauth2/validate"
+
+    def __init__(self, token: str, interval: float = 60 * 60, warn_before: float = 24 * 60 * 60):
+        self.token = token[len("oauth:"):] if token.startswith("oauth:") else token
+        self.interval = interval
+        self.warn_before = warn_before
+        self.expires_in = None  # type: Optional[int]
+
+        self._task = None  # type: Optional[asyncio.Task]
+
+    async def validate(self) -> Optional[int]:
+        """:return: seconds until the token expires, 0 if it never does, None if Twitch rejected it"""
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)) as session:
+            async with session.get(self.VALIDATE_URL, headers={"Authorization": f"OAuth {self.token}"}) as response:
+                if response.status == 401:
+                    logging.error("Twitch token is invalid or expired, generate a new one in General Settings")
+                    self.expires_in = None
+                    return None
+                response.raise_for_status()
+                data = await response.json()
+
+        self.expires_in = data.get("expires_in", 0)
+        if self.expires_in and self.expires_in < self.warn_before:
+            logging.warning(f"Twitch token expires in {self.expires_in / 3600:.1f} hours, generate a new one soon")
+        return self.expires_in
+
+    async def _validate_loop(self):
+        while True:
+            try:
+                await self.validate()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logging.debug(f"Twitch token validation failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self.token and (self._task is None or self._task.done()):
+            self._task = asyncio.ensure_future(self._validate_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -1,41 +1,171 @@
 # todo: add separate functionality for each blacklist types
 # global
 import json
+import os
+import threading
+import time
+from typing import Optional
 
 # local
+from bot.persistence import WriteBehind
+from bot.storage import SQLiteStore, get_store
 from constants import USER_BLACKLIST, SONG_BLACKLIST
 
 
-def read_json(filename):
-    if filename == "blacklist":
-        file = SONG_BLACKLIST
-    else:
-        file = USER_BLACKLIST
+class BlacklistIndex:
+    """
+    In-memory index over one blacklist json file.
 
-    with open(file, "r") as f:
-        data = json.load(f)
-    return data
+    Entries are kept in an insertion-ordered dict so lookups are O(1) and the file is written back in the same
+    order. The file is only re-read when its mtime changes, and mtime is checked at most once per check_interval.
 
+    Changes apply in memory immediately and are written back by a WriteBehind, so a mod blacklisting a batch of
+    songs causes one atomic rewrite instead of one per song.
+    """
 
-def write_json(data, filename):
-    if filename == "blacklist":
-        file = SONG_BLACKLIST
-    else:
-        file = USER_BLACKLIST
+    def __init__(self, file: str, key: str, check_interval: float = 1.0, write_delay: float = 1.0):
+        self.file = file
+        self.key = key
+        self.check_interval = check_interval
 
-    with open(file, "w") as f:
-        json.dump(data, f, indent=4)
+        self._entries = {}
+        self._mtime = None
+        self._last_check = 0.0
+        self._lock = threading.RLock()
+        self._writer = WriteBehind(file, self._serialize, delay=write_delay, on_written=self._written)
 
+    def _refresh(self):
+        now = time.monotonic()
+        if self._mtime is not None and now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+        if self._writer.pending:
+            return  # memory is newer than the file until the write lands
 
-def is_blacklisted(user_name):
-    """
-    Reads blacklist file, creates list of blacklisted users, iterates list looking for user.
+        try:
+            mtime = os.stat(self.file).st_mtime_ns
+        except FileNotFoundError:
+            mtime = 0
+        if mtime == self._mtime:
+            return
+
+        with self._lock:
+            if self._writer.pending:
+                return
+            if mtime:
+                with open(self.file, "r") as f:
+                    self._entries = dict.fromkeys(json.load(f).get(self.key, []))
+            else:
+                self._entries = {}
+            self._mtime = mtime
+
+    def _serialize(self) -> str:
+        with self._lock:
+            return json.dumps({self.key: list(self._entries)}, indent=4)
+
+    def _written(self):
+        # our own write, don't reload it
+        with self._lock:
+            if not self._writer.pending:
+                self._mtime = os.stat(self.file).st_mtime_ns
+
+    def flush(self):
+        self._writer.flush()
+
+    def __contains__(self, item) -> bool:
+        self._refresh()
+        return item in self._entries
+
+    def __len__(self) -> int:
+        self._refresh()
+        return len(self._entries)
+
+    def items(self) -> list:
+        self._refresh()
+        return list(self._entries)
+
+    def add(self, item) -> bool:
+        """:return: bool: False if the item was already present"""
+        self._refresh()
+        with self._lock:
+            if item in self._entries:
+                return False
+            self._entries[item] = None
+            self._writer.schedule()
+        return True
+
+    def remove(self, item) -> bool:
+        """:return: bool: False if the item was not present"""
+        self._refresh()
+        with self._lock:
+            if item not in self._entries:
+                return False
+            del self._entries[item]
+            self._writer.schedule()
+        return True
+
+
+class SQLiteBlacklist:
+    """Same interface as BlacklistIndex, backed by a banned_* table of the SQLite store."""
+
+    def __init__(self, store: SQLiteStore, table: str):
+        self.store = store
+        self.table = table
+
+    def __contains__(self, item) -> bool:
+        return self.store.is_banned(self.table, item)
+
+    def __len__(self) -> int:
+        return self.store.count(self.table)
+
+    def items(self) -> list:
+        return self.store.banned(self.table)
+
+    def add(self, item) -> bool:
+        """:return: bool: False if the item was already present"""
+        return self.store.ban(self.table, item)
+
+    def remove(self, item) -> bool:
+        """:return: bool: False if the item was not present"""
+        return self.store.unban(self.table, item)
+
+    def flush(self):
+        pass  # every change is its own transaction
+
+
+class BlacklistService:
+    def __init__(self, user_file: str = USER_BLACKLIST, song_file: str = SONG_BLACKLIST,
+                 store: Optional[SQLiteStore] = None):
+        """
+        :param user_file: user blacklist json, for the json backend
+        :param song_file: song blacklist json, for the json backend
+        :param store: use these tables instead of the json files
+        """
+        if store is not None:
+            self.users = SQLiteBlacklist(store, "banned_users")
+            self.songs = SQLiteBlacklist(store, "banned_tracks")
+        else:
+            self.users = BlacklistIndex(user_file, "users")
+            self.songs = BlacklistIndex(song_file, "blacklist")
+
+    def is_user_blacklisted(self, user_name: str) -> bool:
+        return user_name.lower() in self.users
+
+    def is_song_blacklisted(self, song_id: str) -> bool:
+        return song_id in self.songs
+
+    def flush(self):
+        """Write pending blacklist changes now instead of waiting for the debounce."""
+        self.users.flush()
+        self.songs.flush()
+
+
+_service = None
 
-        TODO: this is super inefficient. Does not need to be O(n)
-            - shouldn't have to read and rebuild list on EVERY request
-            - instead, store a hashmap
-    :param user_name:
-    :return: bool:
-    """
 
-    return user_name.lower() in read_json("blacklist_user")["users"]
+def get_blacklist_service() -> BlacklistService:
+    """The main channel's blacklists, created on first use. Extra channels each have their own."""
+    global _service
+    if _service is None:
+        _service = BlacklistService(store=get_store())
+    return _service
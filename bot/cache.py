@@ -0,0 +1,103 @@
+# Standard Library
+import gzip
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+# Local
+from bot.persistence import atomic_write
+
+
+class TTLCache:
+    """
+    Bounded LRU cache where every entry also expires after a TTL.
+
+    Expiry is stored as wall-clock time so entries can be snapshotted to disk and keep their remaining lifetime
+    across restarts. Reads move an entry to the most-recently-used end; inserts evict from the other end once
+    maxsize is reached.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600, clock=time.time):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            if entry[0] <= self.clock():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl: float = None):
+        expires_at = self.clock() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def entries(self) -> list:
+        """:return: list: unexpired [key, expires_at, value], oldest first"""
+        now = self.clock()
+        with self._lock:
+            return [[key, expires_at, value] for key, (expires_at, value) in self._data.items() if expires_at > now]
+
+    def load_entries(self, entries) -> int:
+        """Restore entries() output, oldest first. :return: int: how many were still unexpired"""
+        now = self.clock()
+        loaded = 0
+        with self._lock:
+            for key, expires_at, value in list(entries)[-self.maxsize:]:
+                if expires_at > now:
+                    self._data[key] = (expires_at, value)
+                    loaded += 1
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return loaded
+
+    def save(self, path: str):
+        """Write unexpired entries to a gzipped json snapshot, oldest first so load() keeps LRU order."""
+        entries = self.entries()
+
+        atomic_write(path, gzip.compress(json.dumps(entries, separators=(",", ":")).encode("utf-8")))
+        logging.debug(f"Saved {len(entries)} cache entries to {path}")
+
+    def load(self, path: str) -> int:
+        """Load a snapshot written by save(). A missing or corrupt snapshot just means a cold cache."""
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable cache snapshot {path}: {e}")
+            return 0
+        return self.load_entries(entries)
+
+
+_MISSING = object()
@@ -0,0 +1,166 @@
+# Standard Library
+import logging
+import os
+from typing import List, Optional
+
+# Local
+from bot.auth import SpotifyTokenManager
+from bot.blacklists import BlacklistService, get_blacklist_service
+from bot.coalesce import RequestCoalescer
+from bot.config_service import ConfigService, get_config_service
+from bot.now_playing import NowPlayingService
+from bot.permissions import chatter_mask, chatter_roles, compile_permissions
+from bot.rate_limit import RateLimiter
+from bot.request_log import RequestLog, get_request_log
+from bot.resolver import TrackBatcher
+from bot.spotify import AsyncSpotify, create_auth_manager
+from bot.storage import SQLiteStore
+from constants import CACHE, CHANNELS_DIR, RATE_LIMIT_STATE
+from ui.models.config import Config
+
+
+class ChannelState:
+    """
+    Everything that belongs to one Twitch channel: its config, blacklists, permissions, rate limiter, request log
+    and its own Spotify account.
+
+    Each channel gets its own AsyncSpotify, and with it its own scheduler, retry budget and circuit breaker, so a
+    slow or rate limited Spotify account only holds back its own channel. Track metadata and search results
+    don't depend on the account, those caches live on the Bot and are shared by every channel.
+    """
+
+    def __init__(self, config_service: ConfigService, blacklists: BlacklistService, request_log: RequestLog,
+                 token_cache: str = CACHE, rate_limit_state: str = RATE_LIMIT_STATE):
+        self.config_service = config_service
+        self.blacklists = blacklists
+        self.request_log = request_log
+        self.rate_limit_state = rate_limit_state
+
+        config = self.config
+        self.name = config.channel.lower()
+        self.command_masks = compile_permissions(config.permissions)
+        self.rate_limiter = RateLimiter(strategy=config.rate_limits.strategy, window=config.rate_limits.window)
+        if config.rate_limits.persist:
+            self.rate_limiter.load(rate_limit_state)
+        self.last_song = None
+
+        self.token_manager = SpotifyTokenManager(create_auth_manager(config, cache_path=token_cache))
+        self.sp = AsyncSpotify(self.token_manager, requests_timeout=10)
+        self.track_batcher = TrackBatcher(self.sp)
+        self.now_playing = NowPlayingService(self.sp)
+        self.request_coalescer = RequestCoalescer(window=config.duplicate_request_window)
+        config_service.subscribe(self.apply_config)
+
+    @property
+    def config(self) -> Config:
+        """Current config snapshot, swapped out whole when the config file changes."""
+        return self.config_service.config
+
+    def apply_config(self, old: Config, new: Config):
+        """Rebuild state derived from config after a live reload. Runs on the bot's loop, between commands."""
+        self.command_masks = compile_permissions(new.permissions)
+        if new.duplicate_request_window != old.duplicate_request_window:
+            self.request_coalescer.set_window(new.duplicate_request_window)
+        if (new.rate_limits.strategy, new.rate_limits.window) != (old.rate_limits.strategy, old.rate_limits.window):
+            # limiter state is tied to its strategy and window, start it fresh
+            self.rate_limiter = RateLimiter(strategy=new.rate_limits.strategy, window=new.rate_limits.window)
+
+    def request_limit(self, author) -> int:
+        """Requests per window for a chatter, from their most generous role. 0 means unlimited."""
+        limits = [getattr(self.config.rate_limits.limits, role) for role in chatter_roles(author, self.name)]
+        return 0 if 0 in limits else max(limits)
+
+    def check_permissions(self, ctx, command_name) -> bool:
+        """
+        RBAC for commands: the command's compiled role mask ANDed with the chatter's roles
+
+        :param ctx: context param from twitchio
+        :param command_name: PermissionSettingDict field name
+        :return: boolean (allow or disallow run)
+        """
+        # badges are turned into a mask once per message, not once per check
+        author_mask = getattr(ctx, "_role_mask", None)
+        if author_mask is None:
+            author_mask = ctx._role_mask = chatter_mask(ctx.author, self.name)
+        return bool(self.command_masks[command_name] & author_mask)
+
+    def start(self):
+        # no-ops if already running
+        self.token_manager.start()
+        self.config_service.start()
+
+    async def close(self):
+        self.config_service.unsubscribe(self.apply_config)
+        self.blacklists.flush()
+        self.request_log.flush()
+        await self.config_service.stop()
+        if self.config.rate_limits.persist:
+            try:
+                self.rate_limiter.save(self.rate_limit_state)
+            except OSError as e:
+                logging.warning(f"Could not save rate limit state for {self.name}: {e}")
+        await self.token_manager.stop()
+        await self.sp.close()
+
+
+def primary_channel() -> ChannelState:
+    """The channel from the main config.json, the one the GUI edits. Its config also holds the bot's login."""
+    config_service = get_config_service()
+    config_service.load()
+    return ChannelState(config_service, get_blacklist_service(), get_request_log())
+
+
+def extra_channels(directory: str = CHANNELS_DIR) -> List[ChannelState]:
+    """
+    Channels configured in CHANNELS_DIR/<name>/config.json. Each folder holds that channel's own files
+    (blacklists, Spotify token cache, request log, database), laid out like the main config folder.
+    The Twitch login settings in these configs are ignored, every channel is joined with the main login.
+    """
+    channels = []
+    try:
+        names = sorted(os.listdir(directory))
+    except FileNotFoundError:
+        return channels
+
+    for name in names:
+        folder = os.path.join(directory, name)
+        try:
+            channel = load_channel(folder)
+        except Exception as e:
+            # e.g. no spotify_client_id, one broken channel shouldn't keep the bot out of the others
+            logging.error(f"Skipping channel {folder}: {e}")
+            continue
+        if channel is not None:
+            channels.append(channel)
+    return channels
+
+
+def load_channel(folder: str) -> Optional[ChannelState]:
+    config_file = os.path.join(folder, "config.json")
+    if not os.path.isfile(config_file):
+        return None
+
+    # the channel defaults to the folder name, on every reload too
+    config_service = ConfigService(config_file, defaults={"channel": os.path.basename(folder)})
+    try:
+        config = config_service.load()
+    except (OSError, ValueError) as e:
+        logging.error(f"Skipping channel config {config_file}: {e}")
+        return None
+
+    user_file = os.path.join(folder, "blacklist_user.json")
+    song_file = os.path.join(folder, "blacklist.json")
+    store = None
+    if config.storage == "sqlite":
+        store = SQLiteStore(os.path.join(folder, "scrypttunes.db"))
+        # the track cache is shared by all channels and lives in the main store
+        store.migrate_json(user_file, song_file, track_cache=None)
+    blacklists = BlacklistService(user_file=user_file, song_file=song_file, store=store)
+    request_log = RequestLog(store=store, path=os.path.join(folder, "request_log.jsonl"))
+    return ChannelState(
+        config_service,
+        blacklists,
+        request_log,
+        token_cache=os.path.join(folder, ".cache"),
+        rate_limit_state=os.path.join(folder, "rate_limits.json"),
+    )
@@ -0,0 +1,70 @@
+# Standard Library
+import asyncio
+
+# Local
+from bot.cache import TTLCache
+
+
+class SingleFlight:
+    """
+    Runs at most one coroutine per key at a time. Callers that arrive while one is running await the same result.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+
+    async def do(self, key, factory):
+        """
+        :param key: hashable key identifying the work
+        :param factory: zero-arg callable returning the coroutine to run if nothing is in flight for key
+        :return: the coroutine's result, shared by every caller with the same key
+        """
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield so one cancelled caller doesn't cancel the work for everyone else
+        return await asyncio.shield(future)
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+
+class RequestCoalescer:
+    """
+    Deduplicates bursts of identical song requests.
+
+    Identical request text shares one in-flight resolution, and a track can only be claimed for queueing once
+    per window seconds. A window of 0 turns queue deduplication off.
+    """
+
+    def __init__(self, window: float = 300, maxsize: int = 1000):
+        self.window = window
+        self._resolving = SingleFlight()
+        self._queued = TTLCache(maxsize=maxsize, ttl=window)
+
+    def set_window(self, window: float):
+        """Applies to claims made from now on."""
+        self.window = window
+        self._queued.ttl = window
+
+    async def resolve(self, key: str, factory):
+        return await self._resolving.do(key, factory)
+
+    def claim(self, track_id: str) -> bool:
+        """
+        Reserve a track for add_to_queue. No await between check and set, so concurrent coroutines can't both win.
+
+        :return: bool: False if the track was already queued within the window
+        """
+        if self.window <= 0:
+            return True
+        if track_id in self._queued:
+            return False
+        self._queued.set(track_id, True)
+        return True
+
+    def release(self, track_id: str):
+        """Give a claim back, e.g. when the request was rejected or add_to_queue failed."""
+        self._queued.pop(track_id)
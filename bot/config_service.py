@@ -0,0 +1,150 @@
+# Standard Library
+import asyncio
+import json
+import logging
+import os
+from typing import Callable, List, Optional
+
+# Third-Party
+from pydantic import ValidationError
+
+# Local
+from constants import CONFIG
+from ui.models.config import Config
+
+# settings that are only read when the bot connects, changing them needs a Stop/Start
+RESTART_FIELDS = ("token", "client_id", "client_secret", "nickname", "channel", "spotify_client_id", "spotify_secret")
+
+
+class ConfigService:
+    """
+    Live config for the running bot.
+
+    `config` is a snapshot that is never mutated once published. A reload reads and validates the file in a worker
+    thread and then swaps the snapshot in with one assignment, so commands read it without locks and never see
+    a half-applied change. Reloads happen when the file's mtime changes or when notify() is called
+    (SettingsController.save_config does, so GUI changes apply immediately).
+    """
+
+    def __init__(self, path: str = CONFIG, check_interval: float = 2.0, defaults: Optional[dict] = None):
+        """
+        :param path: config.json to load and watch
+        :param check_interval: seconds between mtime checks
+        :param defaults: values for fields the file leaves empty, applied to every snapshot
+        """
+        self.path = path
+        self.check_interval = check_interval
+        self.defaults = defaults or {}
+
+        self.config = None  # type: Optional[Config]
+        self._mtime = None  # type: Optional[int]
+        self._listeners = []  # type: List[Callable[[Config, Config], None]]
+        self._loop = None  # type: Optional[asyncio.AbstractEventLoop]
+        self._wake = None  # type: Optional[asyncio.Event]
+        self._task = None  # type: Optional[asyncio.Task]
+
+    def _read(self):
+        """:return: (mtime, Config) of the file on disk. Raises OSError / ValueError / ValidationError."""
+        mtime = os.stat(self.path).st_mtime_ns
+        with open(self.path) as config_file:
+            config_data = json.load(config_file)
+        return mtime, self._with_defaults(Config(**config_data))
+
+    def _with_defaults(self, config: Config) -> Config:
+        missing = {field: value for field, value in self.defaults.items() if not getattr(config, field)}
+        return config.model_copy(update=missing) if missing else config
+
+    def load(self) -> Config:
+        """Blocking first load, falls back to defaults if the file doesn't validate."""
+        try:
+            self._mtime, self.config = self._read()
+        except ValidationError as e:
+            logging.warning(f"Config is invalid, using defaults: {e}")
+            self._mtime, self.config = os.stat(self.path).st_mtime_ns, self._with_defaults(Config())
+        return self.config
+
+    def subscribe(self, listener: Callable[[Config, Config], None]):
+        """:param listener: called as listener(old, new) on the bot's event loop after each swap"""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[Config, Config], None]):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    async def reload(self, force: bool = False) -> bool:
+        """
+        :param force: reload even if the mtime hasn't changed
+        :return: bool: True if a new snapshot was swapped in
+        """
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return False
+        if mtime == self._mtime and not force:
+            return False
+
+        try:
+            mtime, config = await asyncio.get_running_loop().run_in_executor(None, self._read)
+        except (OSError, ValueError, ValidationError) as e:
+            # keep serving the old snapshot, a half written or invalid file must never take the bot down
+            self._mtime = mtime  # and don't warn again until it changes
+            logging.warning(f"Config reload failed, keeping the current settings: {e}")
+            return False
+
+        self._mtime = mtime
+        if config == self.config:
+            return False
+
+        old, self.config = self.config, config
+        for field in RESTART_FIELDS:
+            if getattr(old, field) != getattr(config, field):
+                logging.info(f"Config '{field}' changed, it takes effect after the bot is restarted")
+        logging.info("Config reloaded")
+        for listener in self._listeners:
+            try:
+                listener(old, config)
+            except Exception:
+                logging.exception("Config listener failed")
+        return True
+
+    def notify(self):
+        """Ask for a reload now. Safe to call from any thread, does nothing while the bot isn't running."""
+        loop, wake = self._loop, self._wake
+        if loop is not None and wake is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(wake.set)
+
+    async def _watch_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.check_interval)
+            except asyncio.TimeoutError:
+                pass
+            force = self._wake.is_set()
+            self._wake.clear()
+            await self.reload(force=force)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._loop = asyncio.get_event_loop()
+            self._wake = asyncio.Event()
+            self._task = asyncio.ensure_future(self._watch_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._loop = self._wake = None
+
+
+_config_service = None
+
+
+def get_config_service() -> ConfigService:
+    global _config_service
+    if _config_service is None:
+        _config_service = ConfigService()
+    return _config_service
@@ -0,0 +1,200 @@
+# Standard Library
+import atexit
+import copy
+import gzip
+import json
+import logging
+import os
+import queue
+import shutil
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional
+
+# Local
+from bot.config_service import get_config_service
+from constants import JSON_LOG_FILE, LOG_FILE
+from ui.models.config import LogConfig
+
+FILE_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+def parse_level(name: str, default: int = logging.INFO) -> int:
+    level = logging.getLevelName(str(name).upper())
+    if not isinstance(level, int):
+        logging.warning(f"Unknown log level '{name}', using {logging.getLevelName(default)}")
+        return default
+    return level
+
+
+def _gzip_rotator(source: str, dest: str):
+    with open(source, "rb") as f_in, gzip.open(dest, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+def rotating_file_handler(path: str, max_bytes: int = 1 * 1024 * 1024, backup_count: int = 5) -> RotatingFileHandler:
+    """RotatingFileHandler that gzips what it rotates out: app.log, app.log.1.gz, app.log.2.gz, ..."""
+    handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+    handler.namer = lambda name: name + ".gz"
+    handler.rotator = _gzip_rotator
+    return handler
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, for log shippers and jq."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class LevelFilter(logging.Filter):
+    """
+    Per subsystem levels. A subsystem is a logger name, matched by prefix ("twitchio" covers
+    "twitchio.websocket"), or for the bot's own logging.info(...) calls on the root logger, the module name.
+    """
+
+    def __init__(self, config: LogConfig):
+        super().__init__()
+        self.configure(config)
+
+    def configure(self, config: LogConfig):
+        self.default = parse_level(config.level)
+        self.levels = {name: parse_level(level, self.default) for name, level in config.levels.items()}
+        self.min_level = min([self.default, *self.levels.values()])
+        self._cache = {}  # type: Dict[str, int]
+
+    def level_for(self, name: str) -> int:
+        level = self._cache.get(name)
+        if level is None:
+            level = self.default
+            prefix = name
+            while prefix:
+                if prefix in self.levels:
+                    level = self.levels[prefix]
+                    break
+                prefix = prefix.rpartition(".")[0]
+            self._cache[name] = level
+        return level
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= self.level_for(record.module if record.name == "root" else record.name)
+
+
+class _QueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # only merge the args here, the formatting is left to the listener's handlers. Tracebacks are turned
+        # into text now, the frames they point at may be gone by the time the listener gets to them.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class LogPipeline:
+    """
+    The process's one logging setup. The root logger gets a single QueueHandler, so logging from the bot's
+    event loop costs a level check and a queue put. A QueueListener thread does everything else: console
+    output, the rotating (gzipped) log file, the optional JSON log and the GUI log view.
+    """
+
+    def __init__(self, config: LogConfig, console: Optional[logging.Handler] = None, log_file: str = LOG_FILE,
+                 json_file: str = JSON_LOG_FILE):
+        self.queue = queue.SimpleQueue()
+        self.filter = LevelFilter(config)
+        self.handler = _QueueHandler(self.queue)
+        self.handler.addFilter(self.filter)
+
+        handlers = []
+        if console is not None:
+            handlers.append(console)
+        file_handler = rotating_file_handler(log_file)
+        file_handler.setFormatter(logging.Formatter(FILE_FORMAT))
+        handlers.append(file_handler)
+        if config.json_file:
+            json_handler = rotating_file_handler(json_file)
+            json_handler.setFormatter(JsonFormatter())
+            handlers.append(json_handler)
+
+        self.listener = QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self._running = False
+
+    def start(self):
+        root = logging.getLogger()
+        root.addHandler(self.handler)
+        root.setLevel(self.filter.min_level)
+        self.listener.start()
+        self._running = True
+
+    def configure(self, config: LogConfig):
+        """Apply new levels. The JSON log is only switched on or off at startup."""
+        self.filter.configure(config)
+        logging.getLogger().setLevel(self.filter.min_level)
+
+    def add_handler(self, handler: logging.Handler):
+        # swapping the whole tuple is atomic, the listener thread sees either the old or the new one
+        self.listener.handlers = self.listener.handlers + (handler,)
+
+    def stop(self):
+        """Flush everything still queued, then close the handlers."""
+        if not self._running:
+            return
+        self._running = False
+        logging.getLogger().removeHandler(self.handler)
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+
+
+_pipeline = None  # type: Optional[LogPipeline]
+
+
+def start_logging(console: Optional[logging.Handler] = None) -> LogPipeline:
+    """
+    Set up logging for the process from the config's `log` settings, once, before anything else logs.
+
+    :param console: handler for terminal output, if any (RichHandler in the GUI, a StreamHandler headless)
+    """
+    global _pipeline
+    if _pipeline is not None:
+        return _pipeline
+
+    config_service = get_config_service()
+    try:
+        config = config_service.config or config_service.load()
+        log_config = config.log
+    except (OSError, ValueError):
+        log_config = LogConfig()  # no config yet
+
+    _pipeline = LogPipeline(log_config, console)
+    _pipeline.start()
+    atexit.register(_pipeline.stop)
+    config_service.subscribe(_apply_config)
+    return _pipeline
+
+
+def _apply_config(old, new):
+    if _pipeline is not None and new.log != old.log:
+        _pipeline.configure(new.log)
+
+
+def add_handler(handler: logging.Handler):
+    """Attach a handler to the pipeline's listener, or straight to the root logger if there is no pipeline."""
+    if _pipeline is not None:
+        _pipeline.add_handler(handler)
+    else:
+        logging.getLogger().addHandler(handler)
@@ -0,0 +1,103 @@
+"""
+Offline classification of chat input: Spotify / YouTube links, spotify: URIs, raw track IDs and plain search text.
+
+Everything here is regex work on precompiled patterns, no network. Only spotify.link short links need a network
+round-trip to find the track they point at.
+"""
+# Standard Library
+import re
+from enum import Enum
+from typing import NamedTuple, Optional
+
+
+class LinkKind(Enum):
+    TEXT = "text"  # plain search text
+    SPOTIFY_TRACK = "track"
+    SPOTIFY_ALBUM = "album"
+    SPOTIFY_ARTIST = "artist"
+    SPOTIFY_PLAYLIST = "playlist"
+    SPOTIFY_EPISODE = "episode"
+    SPOTIFY_SHORT = "spotify_short"  # spotify.link, needs a redirect lookup
+    SPOTIFY_UNSUPPORTED = "spotify_unsupported"
+    YOUTUBE_VIDEO = "youtube_video"
+    YOUTUBE_UNSUPPORTED = "youtube_unsupported"
+    OTHER_URL = "other_url"
+
+
+class MediaLink(NamedTuple):
+    kind: LinkKind
+    id: Optional[str]
+    text: str
+
+
+SPOTIFY_KINDS = {
+    "track": LinkKind.SPOTIFY_TRACK,
+    "album": LinkKind.SPOTIFY_ALBUM,
+    "artist": LinkKind.SPOTIFY_ARTIST,
+    "playlist": LinkKind.SPOTIFY_PLAYLIST,
+    "episode": LinkKind.SPOTIFY_EPISODE,
+}
+
+# same pattern the bot always used to decide whether !sr input is a url, now compiled once
+URL_REGEX = re.compile(
+    r"(?i)\b("
+    r"(?:https?://|www\d{0,3}[.]|[a-z0-9.\-]+[.][a-z]{2,4}/)"
+    r"(?:[^\s()<>]+|\(([^\s()<>]+|(\([^\s()<>]+\)))*\))+"
+    r"(?:\(([^\s()<>]+|(\([^\s()<>]+\)))*\)|"
+    r"[^\s`!()\[\]{};:'\".,<>?«»“”‘’]))"
+)
+
+_SPOTIFY_URI_REGEX = re.compile(r"^spotify:(track|album|artist|playlist|episode):([0-9A-Za-z]+)$")
+# every supported link shape in one anchored pattern, so a known link costs a single regex pass
+_KNOWN_LINK_REGEX = re.compile(
+    r"^(?:https?://)?(?:"
+    r"(?:open|play)\.spotify\.com/(?:intl-[\w-]+/)?(?P<spotify_type>track|album|artist|playlist|episode)/"
+    r"(?P<spotify_id>[0-9A-Za-z]+)"
+    r"|spotify(?:\.app)?\.link/(?P<short_id>[0-9A-Za-z]+)"
+    r"|(?:www\.|m\.|music\.)?youtube\.com/(?:watch\?(?:\S*&)?v=|(?:shorts|embed|live|v)/)(?P<video_id>[\w-]{11})"
+    r"|(?:www\.)?youtu\.be/(?P<short_video_id>[\w-]{11})"
+    r")(?:[/?#&]\S*)?$",
+    re.IGNORECASE,
+)
+_HOST_REGEX = re.compile(r"^(?:https?://)?([^/?#\s]+)", re.IGNORECASE)
+_TRACK_ID_REGEX = re.compile(r"^[0-9A-Za-z]{22}$")
+
+
+def parse_media_link(text: str) -> MediaLink:
+    """
+    Classify chat input and pull out the media ID where there is one.
+
+    :param text: raw command argument
+    :return: MediaLink: kind, id (track/album/video id, short link code) and the stripped input
+    """
+    text = text.strip()
+    if "." not in text and ":" not in text:
+        return MediaLink(LinkKind.TEXT, None, text)  # fast path for most search text
+
+    match = _SPOTIFY_URI_REGEX.match(text)
+    if match:
+        return MediaLink(SPOTIFY_KINDS[match.group(1)], match.group(2), text)
+
+    match = _KNOWN_LINK_REGEX.match(text)
+    if match:
+        spotify_type, spotify_id, short_id, video_id, short_video_id = match.groups()
+        if spotify_id:
+            return MediaLink(SPOTIFY_KINDS[spotify_type.lower()], spotify_id, text)
+        if short_id:
+            return MediaLink(LinkKind.SPOTIFY_SHORT, short_id, text)
+        return MediaLink(LinkKind.YOUTUBE_VIDEO, video_id or short_video_id, text)
+
+    if not URL_REGEX.match(text):
+        return MediaLink(LinkKind.TEXT, None, text)
+
+    host = _HOST_REGEX.match(text).group(1).lower()
+    if "spotify" in host:
+        return MediaLink(LinkKind.SPOTIFY_UNSUPPORTED, None, text)
+    if "youtube" in host or "youtu.be" in host:
+        return MediaLink(LinkKind.YOUTUBE_UNSUPPORTED, None, text)
+    return MediaLink(LinkKind.OTHER_URL, None, text)
+
+
+def is_track_id(text: str) -> bool:
+    """Raw 22 character base62 Spotify ID, as mods sometimes paste into !blacklist."""
+    return _TRACK_ID_REGEX.match(text) is not None
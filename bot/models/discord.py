@@ -1,5 +1,5 @@
 from typing import List, Optional
-import requests
+
 from pydantic import BaseModel, Field, HttpUrl
 
 
@@ -40,6 +40,9 @@ class Embed(BaseModel):
     url: Optional[str] = None
     description: Optional[str] = None
     color: Optional[int] = None
+    timestamp: Optional[str] = None  # ISO 8601
+    fields: Optional[List[Field_]] = None
+    footer: Optional[Footer] = None
 
 
 class DiscordWebhook(BaseModel):
@@ -77,58 +80,6 @@ class DiscordWebhook(BaseModel):
             }
         }
 
-    def post_message(self) -> requests.Response:
-        """
-        Send the webhook message to Discord.
-
-        Returns:
-            requests.Response: The response from Discord's API
-
-        Raises:
-            requests.RequestException: If the request fails
-        """
-        payload = self.model_dump()
-
-        # Remove None values to keep payload clean
-        payload = {k: v for k, v in payload.items() if v is not None}
-
-        headers = {
-            'Content-Type': 'application/json',
-        }
-
-        response = requests.post(
-            WEBHOOK_URL,
-            json=payload,
-            headers=headers
-        )
-
-        response.raise_for_status()
-        return response
-
-    @classmethod
-    def send_message(
-            cls,
-            content: str,
-            username: Optional[str] = None,
-            avatar_url: Optional[str] = None,
-            embeds: Optional[List[Embed]] = None
-    ) -> requests.Response:
-        """
-        Convenience method to quickly send a message without creating a webhook instance first.
-
-        Args:
-            content: The message content
-            username: Optional username override
-            avatar_url: Optional avatar URL override
-            embeds: Optional list of embeds
-
-        Returns:
-            requests.Response: The response from Discord's API
-        """
-        webhook = cls(
-            content=content,
-            username=username,
-            avatar_url=avatar_url,
-            embeds=embeds
-        )
-        return webhook.post_message()
\ No newline at end of file
+    def payload(self) -> dict:
+        """Request body for Discord's execute webhook endpoint, None values left out."""
+        return self.model_dump(mode="json", exclude_none=True)
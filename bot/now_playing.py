@@ -0,0 +1,71 @@
+# Standard Library
+import asyncio
+import time
+from typing import Optional
+
+# Local
+from bot.spotify import AsyncSpotify
+
+
+class NowPlayingSnapshot:
+    """currently_playing() response plus the time it was fetched, so progress can be extrapolated locally."""
+
+    def __init__(self, data: Optional[dict], fetched_at: float):
+        self.fetched_at = fetched_at
+        self.item = data["item"] if data else None
+        self.is_playing = bool(data and data.get("is_playing"))
+        self._progress_ms = (data.get("progress_ms") or 0) if data else 0
+
+    def progress_ms(self, now: float) -> int:
+        if self.item is None:
+            return 0
+        progress = self._progress_ms
+        if self.is_playing:
+            progress += int((now - self.fetched_at) * 1000)
+        return min(progress, self.item["duration_ms"])
+
+    def is_finished(self, now: float) -> bool:
+        return self.item is not None and self.is_playing and self.progress_ms(now) >= self.item["duration_ms"]
+
+
+class NowPlayingService:
+    """
+    Shared now-playing state for !np.
+
+    Serves a snapshot for up to max_age seconds (or until the extrapolated progress runs past the end of the song).
+    When it needs refreshing, concurrent callers all wait on one in-flight fetch instead of each calling Spotify.
+    """
+
+    def __init__(self, sp: AsyncSpotify, max_age: float = 5.0, clock=time.monotonic):
+        self.sp = sp
+        self.max_age = max_age
+        self.clock = clock
+
+        self._snapshot = None  # type: Optional[NowPlayingSnapshot]
+        self._inflight = None  # type: Optional[asyncio.Future]
+
+    async def get(self) -> NowPlayingSnapshot:
+        now = self.clock()
+        snapshot = self._snapshot
+        if snapshot is not None and now - snapshot.fetched_at < self.max_age and not snapshot.is_finished(now):
+            return snapshot
+
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._fetch())
+            self._inflight.add_done_callback(self._clear_inflight)
+        # shield so one cancelled caller doesn't cancel the fetch for everyone else
+        return await asyncio.shield(self._inflight)
+
+    def _clear_inflight(self, future: asyncio.Future):
+        self._inflight = None
+        if not future.cancelled():
+            future.exception()  # mark retrieved, the waiters handle it
+
+    async def _fetch(self) -> NowPlayingSnapshot:
+        # retries happen inside AsyncSpotify, once for every waiting caller
+        data = await self.sp.currently_playing()
+        self._snapshot = NowPlayingSnapshot(data, self.clock())
+        return self._snapshot
+
+    def invalidate(self):
+        self._snapshot = None
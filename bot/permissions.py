@@ -0,0 +1,63 @@
+# Local
+from constants import Permission
+from ui.models.config import PermissionConfig, PermissionSettingDict
+
+# PermissionConfig field name -> bit, in field order: unsubbed, subscriber, vip, mod, broadcaster
+ROLE_BITS = {role: 1 << i for i, role in enumerate(PermissionConfig.model_fields)}
+
+# Twitch badge name -> PermissionConfig field name
+BADGE_ROLES = {
+    Permission.SUBBED.value: "subscriber",
+    "founder": "subscriber",
+    Permission.VIP.value: "vip",
+    Permission.MOD.value: "mod",
+    Permission.BROADCASTER.value: "broadcaster",
+}
+BADGE_BITS = {badge: ROLE_BITS[role] for badge, role in BADGE_ROLES.items()}
+
+
+def compile_permissions(permissions: PermissionSettingDict) -> dict:
+    """
+    Turn the permission settings into one bitmask of allowed roles per command. Done once when config loads,
+    so checking a command is a single AND.
+
+    :param permissions: config.permissions
+    :return: dict: command name -> role mask
+    """
+    masks = {}
+    for command_name in type(permissions).model_fields:
+        permission_config = getattr(permissions, command_name).permission_config
+        mask = 0
+        for role, bit in ROLE_BITS.items():
+            if getattr(permission_config, role):
+                mask |= bit
+        masks[command_name] = mask
+    return masks
+
+
+def chatter_mask(author, channel: str = None) -> int:
+    """
+    Role bits of a chatter. Everyone has "unsubbed".
+
+    :param author: twitchio Chatter
+    :param channel: channel name, its owner counts as broadcaster even without the badge
+    :return: int: role mask
+    """
+    mask = ROLE_BITS["unsubbed"]
+    for badge in author.badges:
+        mask |= BADGE_BITS.get(badge, 0)
+    if channel and author.name.lower() == channel.lower():
+        mask |= ROLE_BITS["broadcaster"]
+    return mask
+
+
+def chatter_roles(author, channel: str = None) -> set:
+    """
+    Roles of a chatter, named like the PermissionConfig fields. Everyone has "unsubbed".
+
+    :param author: twitchio Chatter
+    :param channel: channel name, its owner counts as broadcaster even without the badge
+    :return: set: role names
+    """
+    mask = chatter_mask(author, channel)
+    return {role for role, bit in ROLE_BITS.items() if mask & bit}
@@ -0,0 +1,99 @@
+# Standard Library
+import atexit
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Optional, Union
+
+
+def atomic_write(path: str, data: Union[str, bytes], mode: int = None):
+    """
+    Replace a file's contents without ever leaving it half written: write a temp file in the same directory,
+    fsync it, then rename it over the target.
+
+    :param path: file to replace
+    :param data: new contents, text is written as utf-8
+    :param mode: optional permission bits, applied before the rename
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with (os.fdopen(fd, "wb") if isinstance(data, bytes) else os.fdopen(fd, "w", encoding="utf-8")) as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if mode is not None:
+            os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class WriteBehind:
+    """
+    Debounced, crash-safe writer for one file.
+
+    Callers change their in-memory state right away and call schedule(). The file is rewritten once things have
+    been quiet for `delay` seconds (at most `max_delay` after the first unsaved change) with atomic_write, so a
+    burst of N changes costs one write and the file on disk is always either the old or the new version.
+    Anything still pending is flushed at interpreter exit.
+    """
+
+    def __init__(self, path: str, serialize, delay: float = 1.0, max_delay: float = 5.0, on_written=None):
+        """
+        :param path: file to write
+        :param serialize: zero-arg callable returning the file contents, called at flush time
+        :param on_written: optional callback after each successful write
+        """
+        self.path = path
+        self.serialize = serialize
+        self.delay = delay
+        self.max_delay = max_delay
+        self.on_written = on_written
+
+        self._dirty_since = None  # type: Optional[float]
+        self._timer = None  # type: Optional[threading.Timer]
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        atexit.register(self.flush)
+
+    @property
+    def pending(self) -> bool:
+        return self._dirty_since is not None
+
+    def schedule(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._dirty_since is None:
+                self._dirty_since = now
+            if self._timer is not None:
+                self._timer.cancel()
+            due = min(now + self.delay, self._dirty_since + self.max_delay)
+            self._timer = threading.Timer(max(due - now, 0), self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Write now if anything is pending. Safe to call from any thread."""
+        with self._flush_lock:
+            with self._lock:
+                if self._dirty_since is None:
+                    return
+                self._dirty_since = None
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            try:
+                atomic_write(self.path, self.serialize())
+            except OSError as e:
+                logging.error(f"Couldn't save {self.path}, retrying: {e}")
+                self.schedule()
+                return
+            if self.on_written is not None:
+                self.on_written()
@@ -0,0 +1,177 @@
+# Standard Library
+import json
+import logging
+import time
+from collections import OrderedDict, deque
+
+# Local
+from bot.persistence import atomic_write
+
+
+class SlidingWindow:
+    """
+    Exact sliding window: a chatter may make `limit` requests in any `window` seconds.
+
+    Each slot keeps at most `limit` timestamps, so a check is O(limit) memory and O(1) time.
+    """
+
+    name = "sliding_window"
+
+    class Slot:
+        __slots__ = ("touched", "hits")
+
+        def __init__(self, touched: float):
+            self.touched = touched
+            self.hits = deque()
+
+    def __init__(self, window: float):
+        self.window = window
+
+    def new_slot(self, now: float):
+        return self.Slot(now)
+
+    def hit(self, slot, limit: int, now: float) -> float:
+        hits = slot.hits
+        while hits and now - hits[0] >= self.window:
+            hits.popleft()
+        if len(hits) >= limit:
+            return hits[0] + self.window - now
+        hits.append(now)
+        return 0.0
+
+    def dump_slot(self, slot) -> list:
+        return list(slot.hits)
+
+    def load_slot(self, state: list, touched: float):
+        slot = self.Slot(touched)
+        slot.hits.extend(state)
+        return slot
+
+
+class TokenBucket:
+    """
+    Token bucket: `limit` tokens, refilled evenly over `window` seconds. Allows short bursts up to `limit`.
+    """
+
+    name = "token_bucket"
+
+    class Slot:
+        __slots__ = ("touched", "tokens", "updated")
+
+        def __init__(self, touched: float, tokens: float = None):
+            self.touched = touched
+            self.tokens = tokens
+            self.updated = touched
+
+    def __init__(self, window: float):
+        self.window = window
+
+    def new_slot(self, now: float):
+        return self.Slot(now)
+
+    def hit(self, slot, limit: int, now: float) -> float:
+        rate = limit / self.window
+        if slot.tokens is None:
+            slot.tokens = float(limit)
+        else:
+            slot.tokens = min(float(limit), slot.tokens + (now - slot.updated) * rate)
+        slot.updated = now
+
+        if slot.tokens < 1:
+            return (1 - slot.tokens) / rate
+        slot.tokens -= 1
+        return 0.0
+
+    def dump_slot(self, slot) -> list:
+        return [slot.tokens, slot.updated]
+
+    def load_slot(self, state: list, touched: float):
+        slot = self.Slot(touched, state[0])
+        slot.updated = state[1]
+        return slot
+
+
+STRATEGIES = {
+    SlidingWindow.name: SlidingWindow,
+    TokenBucket.name: TokenBucket,
+}
+
+
+class RateLimiter:
+    """
+    Per-chatter request limiter with pluggable strategies.
+
+    Slots live in an OrderedDict ordered by last allowed request, so chatters idle for longer than the window are expired from
+    the front on every check and memory only tracks recently active chatters. max_entries is a hard cap on top.
+    """
+
+    def __init__(self, strategy: str = SlidingWindow.name, window: float = 300, max_entries: int = 100_000,
+                 clock=time.time):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown rate limit strategy: {strategy}")
+        self.strategy = STRATEGIES[strategy](window)
+        self.window = window
+        self.max_entries = max_entries
+        self.clock = clock
+
+        self._slots = OrderedDict()
+
+    def _expire(self, now: float):
+        while self._slots:
+            key, slot = next(iter(self._slots.items()))
+            if now - slot.touched < self.window and len(self._slots) <= self.max_entries:
+                break
+            del self._slots[key]
+
+    def hit(self, key: str, limit: int) -> float:
+        """
+        Record a request if the chatter is under their limit.
+
+        :param key: chatter name
+        :param limit: requests allowed per window, 0 for unlimited
+        :return: float: 0 if allowed, otherwise seconds until the next request is allowed
+        """
+        if limit <= 0:
+            return 0.0
+
+        now = self.clock()
+        self._expire(now)
+
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = self.strategy.new_slot(now)
+
+        retry_after = self.strategy.hit(slot, limit, now)
+        if not retry_after:
+            # only allowed requests keep a slot alive, once idle for a full window it holds no state worth keeping
+            slot.touched = now
+            self._slots.move_to_end(key)
+        return retry_after
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def save(self, path: str):
+        now = self.clock()
+        self._expire(now)
+        state = {
+            "strategy": self.strategy.name,
+            "slots": [[key, slot.touched, self.strategy.dump_slot(slot)] for key, slot in self._slots.items()],
+        }
+        atomic_write(path, json.dumps(state, separators=(",", ":")))
+
+    def load(self, path: str):
+        try:
+            with open(path) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable rate limit state {path}: {e}")
+            return
+
+        if state.get("strategy") != self.strategy.name:
+            return  # strategy changed since the state was saved, start fresh
+        for key, touched, slot_state in state["slots"]:
+            self._slots[key] = self.strategy.load_slot(slot_state, touched)
+        self._expire(self.clock())
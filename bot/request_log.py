@@ -0,0 +1,173 @@
+# Standard Library
+import atexit
+import json
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+from typing import List, Optional, Tuple
+
+# Local
+from bot.storage import SQLiteStore, get_store
+from constants import REQUEST_LOG
+
+# request outcomes, everything except QUEUED is a rejection reason
+QUEUED = "queued"
+NOT_FOUND = "not_found"
+USER_BLACKLISTED = "user_blacklisted"
+SONG_BLACKLISTED = "song_blacklisted"
+TOO_LONG = "too_long"
+DUPLICATE = "duplicate"
+RATE_LIMITED = "rate_limited"
+SPOTIFY_DOWN = "spotify_down"
+ERROR = "error"
+
+
+class RequestLog:
+    """
+    Append-only log of song requests: who asked for what, when, how it ended and how long resolving took.
+
+    Every request is appended to the SQLite request_history table when that backend is enabled, otherwise to a
+    JSON-lines file. The appends happen on a background writer thread, in batches, so a request never waits on
+    disk. Aggregates for the current stream (since the bot process started) are kept in memory and updated on
+    each record, so !topsongs, !mystats and the GUI stats tab never scan the log.
+    """
+
+    def __init__(self, store: Optional[SQLiteStore] = None, path: str = REQUEST_LOG):
+        self.store = store
+        self.path = path
+        self.started_at = time.time()
+
+        self._songs = Counter()  # track id -> times queued
+        self._song_names = {}  # track id -> "name"
+        self._requesters = Counter()  # user -> requests made
+        self._outcomes = Counter()  # outcome -> count
+        self._user_outcomes = {}  # user -> Counter(outcome)
+        self._latency_total = 0.0
+        self._latency_count = 0
+        self._lock = threading.Lock()
+
+        self._rows = queue.SimpleQueue()  # rows to append, and flush() markers
+        self._writer = None  # type: Optional[threading.Thread]
+
+    def record(self, user: str, query: str, outcome: str, track: Optional[dict] = None,
+               latency_ms: Optional[float] = None):
+        """
+        :param user: requester name
+        :param query: what they typed after !sr
+        :param outcome: one of the outcome constants
+        :param track: compact track, if the request resolved to one
+        :param latency_ms: time from the command to the outcome
+        """
+        user = user.lower()
+        track_id = track["id"] if track else None
+        track_name = f"{track['name']} by {', '.join(a['name'] for a in track['artists'])}" if track else None
+        now = time.time()
+
+        with self._lock:
+            self._requesters[user] += 1
+            self._outcomes[outcome] += 1
+            self._user_outcomes.setdefault(user, Counter())[outcome] += 1
+            if outcome == QUEUED:
+                self._songs[track_id] += 1
+                self._song_names[track_id] = track_name
+            if latency_ms is not None:
+                self._latency_total += latency_ms
+                self._latency_count += 1
+
+        self._rows.put((now, user, query, track_id, track_name, outcome, latency_ms))
+        self._start_writer()
+
+    def _start_writer(self):
+        if self._writer is not None:
+            return
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="request-log", daemon=True)
+                self._writer.start()
+                atexit.register(self.flush)
+
+    def _write_loop(self):
+        while True:
+            items = [self._rows.get()]
+            while True:
+                try:
+                    items.append(self._rows.get_nowait())
+                except queue.Empty:
+                    break
+            rows = [item for item in items if isinstance(item, tuple)]
+            if rows:
+                self._write(rows)
+            for item in items:
+                if isinstance(item, threading.Event):
+                    item.set()
+
+    def _write(self, rows: list):
+        try:
+            if self.store is not None:
+                self.store.add_requests(rows)
+            else:
+                fields = ("requested_at", "user", "query", "track_id", "track_name", "outcome", "latency_ms")
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.writelines(json.dumps(dict(zip(fields, row)), separators=(",", ":")) + "\n" for row in rows)
+        except Exception as e:
+            # stats are nice to have, never let them break a request
+            logging.warning(f"Couldn't append {len(rows)} entries to request log: {e}")
+
+    def flush(self, timeout: float = 5.0):
+        """Wait until everything recorded so far has been written. Called at exit."""
+        if self._writer is None:
+            return
+        done = threading.Event()
+        self._rows.put(done)
+        done.wait(timeout)
+
+    def top_songs(self, n: int = 5) -> List[Tuple[str, int]]:
+        """:return: list: ("name by artists", times queued) this stream, most requested first"""
+        with self._lock:
+            return [(self._song_names[track_id], count) for track_id, count in self._songs.most_common(n)]
+
+    def top_requesters(self, n: int = 5) -> List[Tuple[str, int]]:
+        with self._lock:
+            return self._requesters.most_common(n)
+
+    def rejections(self) -> List[Tuple[str, int]]:
+        """:return: list: (outcome, count) for every rejection reason seen this stream"""
+        with self._lock:
+            return [(outcome, count) for outcome, count in self._outcomes.most_common() if outcome != QUEUED]
+
+    def user_stats(self, user: str) -> Counter:
+        """:return: Counter: outcome -> count for one user this stream"""
+        with self._lock:
+            return Counter(self._user_outcomes.get(user.lower(), ()))
+
+    def user_total(self, user: str) -> Optional[int]:
+        """All-time requests by a user, None without the SQLite backend (the JSON log isn't indexed)."""
+        if self.store is None:
+            return None
+        return self.store.execute(
+            "SELECT COUNT(*) FROM request_history WHERE user = ?", (user.lower(),)
+        ).fetchone()[0]
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "started_at": self.started_at,
+                "requests": sum(self._outcomes.values()),
+                "queued": self._outcomes[QUEUED],
+                "avg_latency_ms": self._latency_total / self._latency_count if self._latency_count else None,
+            }
+
+
+_request_log = None
+_request_log_lock = threading.Lock()
+
+
+def get_request_log() -> RequestLog:
+    """Process-wide log, shared by the bot thread and the GUI stats tab."""
+    global _request_log
+    with _request_log_lock:
+        if _request_log is None:
+            _request_log = RequestLog(store=get_store())
+        return _request_log
@@ -0,0 +1,139 @@
+# Standard Library
+import asyncio
+import logging
+import random
+import time
+
+# Third-Party
+import aiohttp
+from spotipy.exceptions import SpotifyException
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling Spotify while the circuit breaker is open."""
+
+    def __init__(self, retry_in: float):
+        super().__init__(f"Spotify circuit open, retrying in {retry_in:.0f}s")
+        self.retry_in = retry_in
+
+
+def is_rate_limited(error: Exception) -> bool:
+    return isinstance(error, SpotifyException) and error.http_status == 429
+
+
+def is_transient(error: Exception) -> bool:
+    """
+    Network errors, timeouts and 5xx are worth retrying. Other 4xx (bad link, no device) are not, and neither
+    is a 429: AsyncSpotify already waited out Retry-After through the scheduler before giving up on it.
+    """
+    if isinstance(error, SpotifyException):
+        return error.http_status >= 500
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive transient failures. While open every call fails fast; after
+    `reset_timeout` seconds one probe call is let through, and its result closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started = 0.0
+
+    def before_call(self):
+        if self.state == self.CLOSED:
+            return
+        now = self.clock()
+        if self.state == self.HALF_OPEN:
+            # a probe that never reported back (hung or lost) mustn't hold the circuit half open for good
+            if now - self._probe_started < self.reset_timeout:
+                raise CircuitOpenError(self._probe_started + self.reset_timeout - now)
+        else:
+            retry_in = self._opened_at + self.reset_timeout - now
+            if retry_in > 0:
+                raise CircuitOpenError(retry_in)
+        self.state = self.HALF_OPEN  # this caller is the probe
+        self._probe_started = now
+
+    def record_aborted(self):
+        """The call was cancelled before Spotify answered. It tells us nothing, so let the next caller probe."""
+        if self.state == self.HALF_OPEN:
+            self.state = self.OPEN
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            logging.info("Spotify is reachable again, closing circuit breaker")
+        self.state = self.CLOSED
+        self._failures = 0
+
+    def record_failure(self):
+        self._failures += 1
+        if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logging.error(
+                    f"Spotify failed {self._failures} times in a row, failing fast for {self.reset_timeout:.0f}s"
+                )
+            self.state = self.OPEN
+            self._opened_at = self.clock()
+
+
+class RetryPolicy:
+    """
+    Retries transient failures with full-jitter exponential backoff, guarded by a shared CircuitBreaker.
+
+    Non-idempotent calls (add_to_queue) are only retried when the connection was never made, so a timeout can't
+    queue the same song twice.
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0,
+                 breaker: CircuitBreaker = None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker()
+
+    async def call(self, factory, idempotent: bool = True):
+        """
+        :param factory: zero-arg callable returning a fresh coroutine for each attempt
+        :param idempotent: whether the call is safe to repeat after it may have reached Spotify
+        """
+        for attempt in range(self.max_attempts):
+            self.breaker.before_call()
+            try:
+                result = await factory()
+            except asyncio.CancelledError:
+                self.breaker.record_aborted()
+                raise
+            except Exception as e:
+                if is_rate_limited(e):
+                    # Spotify is up, just throttling us, that's neither a health signal nor worth another try
+                    self.breaker.record_aborted()
+                    raise
+                if not is_transient(e):
+                    self.breaker.record_success()  # Spotify answered, it just didn't like the request
+                    raise
+                self.breaker.record_failure()
+
+                retryable = idempotent or isinstance(e, aiohttp.ClientConnectorError)
+                if not retryable or attempt == self.max_attempts - 1:
+                    raise
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                logging.info(
+                    f"Spotify call failed ({type(e).__name__}), attempt {attempt + 1}/{self.max_attempts}. "
+                    f"Retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+            else:
+                self.breaker.record_success()
+                return result
@@ -0,0 +1,103 @@
+# Standard Library
+import asyncio
+import logging
+from typing import Optional
+
+# Third-Party
+from spotipy.exceptions import SpotifyException
+
+# Local
+from bot.spotify import AsyncSpotify
+
+
+class TrackBatcher:
+    """
+    Micro-batches track lookups into Spotify's multi-track endpoint.
+
+    Track IDs requested within `delay` seconds of each other are fetched with one GET /tracks call (up to 50 IDs,
+    the API limit) and the results are fanned back out to every waiting coroutine. An ID that is already pending or
+    in flight is not requested twice.
+    """
+
+    MAX_BATCH = 50
+
+    def __init__(self, sp: AsyncSpotify, delay: float = 0.01, max_batch: int = MAX_BATCH):
+        self.sp = sp
+        self.delay = delay
+        self.max_batch = min(max_batch, self.MAX_BATCH)
+
+        self._futures = {}  # track id -> future, for ids waiting for a batch or in flight
+        self._pending = []  # track ids for the next batch
+        self._flush_handle = None  # type: Optional[asyncio.TimerHandle]
+
+    async def get(self, track_id: str) -> dict:
+        """
+        :param track_id: base62 track id
+        :return: dict: full track object
+        """
+        future = self._futures.get(track_id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._futures[track_id] = future
+            self._pending.append(track_id)
+
+            if len(self._pending) >= self.max_batch:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.delay, self._flush)
+
+        # shield so one cancelled caller doesn't fail the lookup for everyone else
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.ensure_future(self._fetch(batch))
+
+    async def _fetch(self, batch: list):
+        futures = [self._futures[track_id] for track_id in batch]
+        logging.debug(f"Fetching {len(batch)} tracks in one batch")
+        try:
+            data = await self.sp.tracks(batch)
+        except SpotifyException as e:
+            if e.http_status == 400 and len(batch) > 1:
+                # one bad ID fails the whole request, look each one up alone so it only fails its own caller
+                logging.debug(f"Batch of {len(batch)} tracks was rejected, fetching them one by one")
+                await asyncio.gather(*(self._fetch_one(track_id, future) for track_id, future in zip(batch, futures)))
+            else:
+                self._fail(futures, e)
+            return
+        except Exception as e:
+            self._fail(futures, e)
+            return
+        finally:
+            for track_id in batch:
+                self._futures.pop(track_id, None)
+
+        for track_id, future, track in zip(batch, futures, data["tracks"]):
+            if future.done():
+                continue
+            if track is None:
+                future.set_exception(SpotifyException(404, -1, f"Track {track_id} not found."))
+            else:
+                future.set_result(track)
+
+    async def _fetch_one(self, track_id: str, future: asyncio.Future):
+        try:
+            track = await self.sp.track(track_id)
+        except Exception as e:
+            self._fail([future], e)
+            return
+        if not future.done():
+            future.set_result(track)
+
+    @staticmethod
+    def _fail(futures: list, e: Exception):
+        for future in futures:
+            if not future.done():
+                future.set_exception(e)
@@ -0,0 +1,110 @@
+# Standard Library
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Optional
+
+
+class Priority(IntEnum):
+    """Lower runs first."""
+    ADMIN = 0  # broadcaster / mod actions
+    REQUEST = 1  # !sr
+    NOW_PLAYING = 2  # !np
+    BACKGROUND = 3
+
+
+# priority of Spotify calls made by the current task, set by each command handler
+current_priority = ContextVar("spotify_priority", default=Priority.REQUEST)
+
+
+def set_priority(priority: Priority):
+    current_priority.set(priority)
+
+
+class SpotifyScheduler:
+    """
+    Gatekeeper every Spotify API call passes through.
+
+    Pending calls are granted in priority order, then FIFO. A call is only started when:
+      - fewer than max_concurrency calls are in flight
+      - no 429 Retry-After block is active (one 429 pauses every caller, not just the one that got it)
+      - fewer than `budget` calls were started in the last `budget_window` seconds (Spotify rate limits over a
+        rolling 30 second window)
+    """
+
+    def __init__(self, max_concurrency: int = 10, budget: int = 100, budget_window: float = 30.0,
+                 clock=time.monotonic):
+        self.max_concurrency = max_concurrency
+        self.budget = budget
+        self.budget_window = budget_window
+        self.clock = clock
+
+        self._waiters = []  # heap of (priority, seq, future)
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._started = deque()  # start times of calls inside the budget window
+        self._blocked_until = 0.0
+        self._wakeup = None  # type: Optional[asyncio.TimerHandle]
+
+    async def acquire(self, priority: Priority = None):
+        if priority is None:
+            priority = current_priority.get()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()  # granted just before the caller was cancelled
+            raise
+
+    def release(self):
+        self._in_flight -= 1
+        self._dispatch()
+
+    def block(self, seconds: float):
+        """Stop starting new calls for `seconds`, e.g. from a 429 Retry-After header."""
+        blocked_until = self.clock() + seconds
+        if blocked_until > self._blocked_until:
+            logging.warning(f"Spotify rate limit hit, pausing all Spotify calls for {seconds:.1f}s")
+            self._blocked_until = blocked_until
+        self._dispatch()
+
+    @property
+    def pending(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    def _dispatch(self):
+        now = self.clock()
+        while self._waiters:
+            if self._waiters[0][2].done():  # waiter was cancelled
+                heapq.heappop(self._waiters)
+                continue
+            if self._in_flight >= self.max_concurrency:
+                return
+            if now < self._blocked_until:
+                return self._schedule_wakeup(self._blocked_until - now)
+
+            while self._started and now - self._started[0] >= self.budget_window:
+                self._started.popleft()
+            if len(self._started) >= self.budget:
+                return self._schedule_wakeup(self._started[0] + self.budget_window - now)
+
+            _, _, future = heapq.heappop(self._waiters)
+            self._in_flight += 1
+            self._started.append(now)
+            future.set_result(None)
+
+    def _schedule_wakeup(self, delay: float):
+        if self._wakeup is None:
+            self._wakeup = asyncio.get_running_loop().call_later(delay, self._on_wakeup)
+
+    def _on_wakeup(self):
+        self._wakeup = None
+        self._dispatch()
@@ -1,128 +1,213 @@
 # Standard Library
 import asyncio
-import datetime
-import json
 import logging
 import os
-import re
+import sqlite3
+import time
 import traceback
-from urllib import request as url_request
-from urllib.parse import quote
+from typing import Optional
 
 # Third-Party
-import requests as req
-import spotipy
-from pydantic import ValidationError, HttpUrl
-from spotipy.oauth2 import SpotifyOAuth
+import aiohttp
+from pydantic import HttpUrl
+from spotipy.exceptions import SpotifyException
 from twitchio.ext import commands
 from twitchio.ext.commands import Context
-import urllib3
 
 # Local
-from bot.blacklists import read_json, write_json
-from bot.models.discord import DiscordWebhook, Embed, Author
-from constants import CACHE, CONFIG
+from bot import request_log
+from bot.alerts import AlertDispatcher, error_summary
+from bot.auth import TwitchTokenMonitor
+from bot.cache import TTLCache
+from bot.channels import ChannelState, extra_channels, primary_channel
+from bot.media_links import LinkKind, MediaLink, parse_media_link
+from bot.resilience import CircuitOpenError
+from bot.scheduler import Priority, set_priority
+from bot.search import NO_RESULT, SearchCache, normalize_query
+from bot.short_links import ShortLinkResolver
+from bot.spotify import compact_track, get_id
+from bot.storage import get_store
+from bot.youtube import YouTubeResolver, search_query
+from constants import CHANNELS_DIR, TRACK_CACHE
 from ui.models.config import Config
 
 
 
-async def is_valid_media_url(url: str, ctx: Context) -> bool:
-    spotify_track_regex = r"^(https:\/\/open.spotify.com\/track\/|spotify:track:)([a-zA-Z0-9]+)(\?.*)?$"
-    if "spotify" in url and not re.match(spotify_track_regex, url):
-        for filter_term in ["artist", "album"]:
-            if filter_term in url:
-                logging.info(f"{filter_term} URLs are not supported")
-                await ctx.send(f"@{ctx.author.name}, {filter_term} URLs are not supported.")
-                return False
+async def is_valid_media_link(link: MediaLink, ctx: Context) -> bool:
+    if link.kind in (LinkKind.SPOTIFY_TRACK, LinkKind.SPOTIFY_SHORT, LinkKind.YOUTUBE_VIDEO):
+        return True
+
+    if link.kind in (LinkKind.SPOTIFY_ALBUM, LinkKind.SPOTIFY_ARTIST, LinkKind.SPOTIFY_PLAYLIST,
+                     LinkKind.SPOTIFY_EPISODE):
+        logging.info(f"{link.kind.value} URLs are not supported")
+        await ctx.send(f"@{ctx.author.name}, {link.kind.value} URLs are not supported.")
+    elif link.kind == LinkKind.SPOTIFY_UNSUPPORTED:
         logging.info(f"Spotify track URL is invalid or unsupported")
         await ctx.send(f"@{ctx.author.name}, the provided Spotify track URL is invalid or unsupported.")
-        return False
-
-    youtube_video_regex = r"^(https?:\/\/)?(www\.|m\.)?(youtube\.com\/watch\?v=|youtu\.be\/)([\w\-]+)(\?.*)?$"
-    if "youtu" in url and not re.match(youtube_video_regex, url):
-        logging.info(f"YouTube url is invalid or unsupported: {url}")
+    elif link.kind == LinkKind.YOUTUBE_UNSUPPORTED:
+        logging.info(f"YouTube url is invalid or unsupported: {link.text}")
         await ctx.send(f"@{ctx.author.name}, the provided YouTube url is invalid or unsupported.")
-        return False
-
-    return True
+    else:
+        logging.info(f"Unsupported link: {link.text}")
+        await ctx.send(f"@{ctx.author.name}, only Spotify and YouTube links are supported.")
+    return False
 
 
 class Bot(commands.Bot):
     def __init__(self):
-        with open(CONFIG) as config_file:
-            config_data = json.load(config_file)
-        try:
-            self.config = Config(**config_data)
-        except ValidationError:
-            self.config = Config()
+        self.primary = primary_channel()
+        self.channels = {self.primary.name: self.primary}
+        for channel in extra_channels():
+            if channel.name in self.channels:
+                logging.warning(f"Channel {channel.name} is configured twice, ignoring the copy in {CHANNELS_DIR}")
+                continue
+            self.channels[channel.name] = channel
+
         super().__init__(
             token=self.config.token,
             client_id=self.config.client_id,
             nick=self.config.nickname,
-            prefix=self.config.prefix,
-            initial_channels=[self.config.channel],
+            # read per message, so each channel has its own prefix and a new prefix applies live
+            prefix=lambda bot, message: bot.get_channel_state(message.channel).config.prefix,
+            initial_channels=list(self.channels),
             case_insensitive=True
         )
 
         self.token = os.environ.get("SPOTIFY_AUTH")
         self.version = "0.3"
 
-        self.request_history = {}
-        self.last_song = None
-
-        self.sp = spotipy.Spotify(
-            auth_manager=SpotifyOAuth(
-                client_id=self.config.spotify_client_id,
-                client_secret=self.config.spotify_secret,
-                redirect_uri="http://127.0.0.1:8080",
-                cache_path=CACHE,
-                scope=[
-                    "user-modify-playback-state",
-                    "user-read-currently-playing",
-                    "user-read-playback-state",
-                    "user-read-recently-played",
-                ]
-            ),
-            requests_timeout=10,
-        )
+        self.twitch_token_monitor = TwitchTokenMonitor(self.config.token)
 
-        self.URL_REGEX = (
-            r"(?i)\b("
-            r"(?:https?://|www\d{0,3}[.]|[a-z0-9.\-]+[.][a-z]{2,4}/)"
-            r"(?:[^\s()<>]+|\(([^\s()<>]+|(\([^\s()<>]+\)))*\))+"
-            r"(?:\(([^\s()<>]+|(\([^\s()<>]+\)))*\)|"
-            r"[^\s`!()\[\]{};:'\".,<>?«»“”‘’]))"
-        )
+        # track id -> compact track metadata, shared by every channel and command and snapshotted across restarts
+        self.track_cache = TTLCache(maxsize=5000, ttl=24 * 60 * 60)
+        self.store = get_store()
+        if self.store is not None:
+            loaded = self.track_cache.load_entries(self.store.load_tracks(self.track_cache.maxsize))
+        else:
+            loaded = self.track_cache.load(TRACK_CACHE)
+        if loaded:
+            logging.info(f"Loaded {loaded} cached tracks")
+        self.search_cache = SearchCache()
+        self.short_links = ShortLinkResolver()
+        self.youtube = YouTubeResolver()
+        self.alerts = AlertDispatcher(self.primary.config_service)
+
+    @property
+    def config(self) -> Config:
+        """Main config snapshot, its Twitch login is used for every channel."""
+        return self.primary.config
+
+    def get_channel_state(self, channel) -> ChannelState:
+        """:param channel: twitchio Channel, None for whispers, which get the main channel's state"""
+        if channel is None:
+            return self.primary
+        return self.channels.get(channel.name.lower(), self.primary)
+
+    def _channel(self, ctx) -> ChannelState:
+        return self.get_channel_state(ctx.channel)
+
+    async def close(self):
+        try:
+            if self.store is not None:
+                self.store.save_tracks(self.track_cache.entries())
+            else:
+                self.track_cache.save(TRACK_CACHE)
+        except (OSError, sqlite3.Error) as e:
+            logging.warning(f"Could not save track cache: {e}")
+        for channel in self.channels.values():
+            await channel.close()
+        await self.twitch_token_monitor.stop()
+        await self.short_links.close()
+        await self.youtube.close()
+        await self.alerts.close()
+        await super().close()
+
+    async def _get_track(self, track: str, state: ChannelState) -> dict:
+        """
+        Track metadata by ID, URI or open.spotify.com URL. Served from the shared track cache when possible.
 
-    def _check_permissions(self, ctx, command_name):
+        :param track: id / uri / url
+        :param state: channel whose Spotify account to ask on a cache miss
+        :return: dict: compact track object
+        """
+        track_id = get_id("track", track)
+        data = self.track_cache.get(track_id)
+        if data is None:
+            data = compact_track(await state.track_batcher.get(track_id))
+            self.track_cache.set(track_id, data)
+        return data
+
+    async def _search_track(self, query: str, state: ChannelState) -> Optional[dict]:
         """
-        RBAC for commands
+        First track search result for a free-text request, None if Spotify has no match.
+        Normalized queries and misses are cached so repeated requests only search once.
 
-        todo: higher permissions are allowed when unchkecked if lower permissions are checked
+        :param query: raw request text
+        :param state: channel whose Spotify account to search with on a cache miss
+        :return: dict: compact track object or None
+        """
+        track_id = self.search_cache.get(query)
+        if track_id == NO_RESULT:
+            return None
+        if track_id is not None:
+            return await self._get_track(track_id, state)
+
+        data = await state.sp.search(query, limit=1, type="track", market="US")
+        items = data["tracks"]["items"]
+        if not items:
+            self.search_cache.set(query, None)
+            return None
+
+        track = compact_track(items[0])
+        self.track_cache.set(track["id"], track)
+        self.search_cache.set(query, track["id"])
+        return track
+
+    async def _track_id(self, song_uri: str) -> Optional[str]:
+        """
+        Track ID from a link, URI or raw ID. Only short links touch the network.
 
-        :param ctx: context param from twitchio
-        :param permission_set: list of permission strings
-        :return: boolean (allow or disallow run)
+        :return: str: track ID, None if it isn't a Spotify track
         """
+        link = parse_media_link(song_uri)
+        if link.kind == LinkKind.SPOTIFY_SHORT:
+            return await self.short_links.resolve(link)
+        try:
+            return get_id("track", song_uri)
+        except SpotifyException:
+            return None
 
-        command_perms = self.config.permissions.model_dump()[command_name]['permission_config']
+    def _log_request(self, ctx, song: str, outcome: str, started: float, track: Optional[dict] = None):
+        latency_ms = (time.monotonic() - started) * 1000
+        self._channel(ctx).request_log.record(ctx.author.name, song, outcome, track, latency_ms)
 
-        allow_all = command_perms['unsubbed']
+    def _set_priority(self, ctx, priority: Priority):
+        """Priority for the Spotify calls this command makes. Broadcaster and mod actions always go first."""
+        set_priority(Priority.ADMIN if ctx.author.is_mod else priority)
 
-        for permission in command_perms:
-            if command_perms[permission]:
-                if (permission in ctx.author.badges) or allow_all:
-                    return True
+    def _check_permissions(self, ctx, command_name):
+        """
+        RBAC for commands, checked against the permissions of the channel the command was sent in
 
-        return False
+        :param ctx: context param from twitchio
+        :param command_name: PermissionSettingDict field name
+        :return: boolean (allow or disallow run)
+        """
+        return self._channel(ctx).check_permissions(ctx, command_name)
 
     async def event_ready(self):
+        # no-ops if already running, event_ready fires again after a reconnect
+        self.twitch_token_monitor.start()
+        for channel_state in self.channels.values():
+            channel_state.start()
+
         logging.info("\n" * 100)
-        logging.info(f"ScryptTunes ready, logged in as: {self.nick}")
-        if self.config.welcome_message:
-            channel = self.get_channel(self.config.channel)
-            if channel:
-                await channel.send(self.config.welcome_message)
+        logging.info(f"ScryptTunes ready, logged in as: {self.nick}, in {', '.join(self.channels)}")
+        for channel_state in self.channels.values():
+            if channel_state.config.welcome_message:
+                channel = self.get_channel(channel_state.name)
+                if channel:
+                    await channel.send(channel_state.config.welcome_message)
 
     @commands.command(name="ping", aliases=["ding"])
     async def ping_command(self, ctx):
@@ -134,12 +219,10 @@ class Bot(commands.Bot):
 
     @commands.command(name="blacklistuser")
     async def blacklist_user(self, ctx, *, user: str):
+        state = self._channel(ctx)
         user = user.lower()
         if ctx.author.is_mod:
-            file = read_json("blacklist_user")
-            if user not in file["users"]:
-                file["users"].append(user)
-                write_json(file, "blacklist_user")
+            if state.blacklists.users.add(user):
                 await ctx.send(f"{user} added to blacklist")
             else:
                 await ctx.send(f"{user} is already blacklisted")
@@ -148,12 +231,10 @@ class Bot(commands.Bot):
 
     @commands.command(name="unblacklistuser")
     async def unblacklist_user(self, ctx, *, user: str):
+        state = self._channel(ctx)
         user = user.lower()
         if ctx.author.is_mod:
-            _file = read_json("blacklist_user")
-            if user in _file["users"]:
-                _file["users"].remove(user)
-                write_json(_file, "blacklist_user")
+            if state.blacklists.users.remove(user):
                 await ctx.send(f"{user} removed from blacklist")
             else:
                 await ctx.send(f"{user} is not blacklisted")
@@ -162,26 +243,22 @@ class Bot(commands.Bot):
 
     @commands.command(name="blacklist", aliases=["blacklistsong", "blacklistadd"])
     async def blacklist_command(self, ctx, *, song_uri: str):
+        state = self._channel(ctx)
         if ctx.author.is_mod:
-            jscon = read_json("blacklist")
-
-            song_uri = song_uri.replace("spotify:track:", "")
+            self._set_priority(ctx, Priority.ADMIN)
+            song_id = await self._track_id(song_uri)
+            if song_id is None:
+                return await ctx.send("That doesn't look like a Spotify track.")
 
-            if song_uri not in jscon["blacklist"]:
-                if re.match(self.URL_REGEX, song_uri):
-                    data = self.sp.track(song_uri)
-                    song_uri = data["uri"]
-                    song_uri = song_uri.replace("spotify:track:", "")
-
-                track = self.sp.track(song_uri)
+            if not state.blacklists.is_song_blacklisted(song_id):
+                track = await self._get_track(song_id, state)
 
                 track_name = track["name"]
 
-                jscon["blacklist"].append(song_uri)
-
-                write_json(jscon, "blacklist")
-
-                await ctx.send(f"Added {track_name} to blacklist.")
+                if state.blacklists.songs.add(song_id):
+                    await ctx.send(f"Added {track_name} to blacklist.")
+                else:
+                    await ctx.send("Song is already blacklisted.")
 
             else:
                 await ctx.send("Song is already blacklisted.")
@@ -193,19 +270,13 @@ class Bot(commands.Bot):
         name="unblacklist", aliases=["unblacklistsong", "blacklistremove"]
     )
     async def unblacklist_command(self, ctx, *, song_uri: str):
+        state = self._channel(ctx)
         if ctx.author.is_mod:
-            jscon = read_json("blacklist")
-
-            song_uri = song_uri.replace("spotify:track:", "")
-
-            if re.match(self.URL_REGEX, song_uri):
-                data = self.sp.track(song_uri)
-                song_uri = data["uri"]
-                song_uri = song_uri.replace("spotify:track:", "")
+            song_uri = await self._track_id(song_uri)
+            if song_uri is None:
+                return await ctx.send("That doesn't look like a Spotify track.")
 
-            if song_uri in jscon["blacklist"]:
-                jscon["blacklist"].remove(song_uri)
-                write_json(jscon, "blacklist")
+            if state.blacklists.songs.remove(song_uri):
                 await ctx.send("Removed that song from the blacklist.")
 
             else:
@@ -215,72 +286,80 @@ class Bot(commands.Bot):
 
     @commands.command(name="np", aliases=["nowplaying", "song"])
     async def np_command(self, ctx):
+        state = self._channel(ctx)
         if self._check_permissions(ctx=ctx, command_name="np_command"):
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    data = self.sp.currently_playing()
-                    if data is None or data["item"] is None:
-                        await ctx.send("No song is currently playing on Spotify!")
-                        return
-                    song_artists = data["item"]["artists"]
-                    song_artists_names = [artist["name"] for artist in song_artists]
-
-                    min_through = int(data["progress_ms"] / (1000 * 60) % 60)
-                    sec_through = int(data["progress_ms"] / (1000) % 60)
-                    time_through = f"{min_through} mins, {sec_through} secs"
+            self._set_priority(ctx, Priority.NOW_PLAYING)
+            try:
+                snapshot = await state.now_playing.get()
+            except CircuitOpenError as e:
+                logging.warning(f"Now playing skipped: {e}")
+                await ctx.send(f"@{ctx.author.name}, Spotify isn't responding right now, try again in a bit!")
+                return
+            except (aiohttp.ClientError,
+                    asyncio.TimeoutError,
+                    SpotifyException) as e:
+                logging.error(f"Error: {str(e)}\nStack trace:\n{traceback.format_exc()}")
+                await ctx.send(f"@{ctx.author.name}, there was an error getting the current song!")
+                self.alerts.alert(
+                    title=f"Now Playing Error in {state.name}'s Channel",
+                    error=error_summary(e),
+                    details=f"{e}\nStack trace:\n{traceback.format_exc()}",
+                    author=ctx.author.name,
+                )
+                return
+
+            if snapshot.item is None:
+                await ctx.send("No song is currently playing on Spotify!")
+                return
+            item = snapshot.item
+            song_artists_names = [artist["name"] for artist in item["artists"]]
+
+            progress_ms = snapshot.progress_ms(state.now_playing.clock())
+            min_through = int(progress_ms / (1000 * 60) % 60)
+            sec_through = int(progress_ms / (1000) % 60)
+            time_through = f"{min_through} mins, {sec_through} secs"
+
+            min_total = int(item["duration_ms"] / (1000 * 60) % 60)
+            sec_total = int(item["duration_ms"] / (1000) % 60)
+            time_total = f"{min_total} mins, {sec_total} secs"
+
+            logging.info(
+                f"Now Playing - {item['name']} by {', '.join(song_artists_names)} | Link: {item['external_urls']['spotify']} | {time_through} - {time_total}")
+            await ctx.send(
+                f"Now Playing - {item['name']} by {', '.join(song_artists_names)} | Link: {item['external_urls']['spotify']} | {time_through} - {time_total}"
+            )
+        else:
+            return await ctx.send(f"@{ctx.author.name} You don't have permission to do that!")
 
-                    min_total = int(data["item"]["duration_ms"] / (1000 * 60) % 60)
-                    sec_total = int(data["item"]["duration_ms"] / (1000) % 60)
-                    time_total = f"{min_total} mins, {sec_total} secs"
+    @commands.command(name="topsongs", aliases=["topsong"])
+    async def topsongs_command(self, ctx):
+        state = self._channel(ctx)
+        if self._check_permissions(ctx=ctx, command_name="songrequest_command"):
+            top_songs = state.request_log.top_songs(5)
+            if not top_songs:
+                return await ctx.send("No songs have been requested this stream yet!")
+            await ctx.send("Top songs this stream: " + " | ".join(
+                f"{i}. {name} ({count})" for i, (name, count) in enumerate(top_songs, start=1)
+            ))
+        else:
+            return await ctx.send(f"@{ctx.author.name} You don't have permission to do that!")
 
-                    logging.info(
-                        f"Now Playing - {data['item']['name']} by {', '.join(song_artists_names)} | Link: {data['item']['external_urls']['spotify']} | {time_through} - {time_total}")
-                    await ctx.send(
-                        f"Now Playing - {data['item']['name']} by {', '.join(song_artists_names)} | Link: {data['item']['external_urls']['spotify']} | {time_through} - {time_total}"
-                    )
-                    return  # Success! Exit the retry loop
-
-                except (req.exceptions.ConnectionError, 
-                        urllib3.exceptions.ProtocolError,
-                        spotipy.exceptions.SpotifyException) as e:
-                    
-                    if attempt < max_retries - 1:  # Still have retries left
-                        logging.info(f"Spotify connection failed, attempt {attempt + 1}/{max_retries}. Recreating client...")
-                        # Recreate the Spotify client
-                        self.sp = spotipy.Spotify(
-                            auth_manager=SpotifyOAuth(
-                                client_id=self.config.spotify_client_id,
-                                client_secret=self.config.spotify_secret,
-                                redirect_uri="http://127.0.0.1:8080",
-                                cache_path=CACHE,
-                                scope=[
-                                    "user-modify-playback-state",
-                                    "user-read-currently-playing",
-                                    "user-read-playback-state",
-                                    "user-read-recently-played",
-                                ],
-                            )
-                        )
-                        await asyncio.sleep(2 ** attempt)
-                        continue
-                    
-                    # If we're here, we've exhausted all retries
-                    logging.error(f"Error: {str(e)}\nStack trace:\n{traceback.format_exc()}")
-                    await ctx.send(f"@{ctx.author.name}, there was an error getting the current song after {max_retries} attempts!")
-                    DiscordWebhook.send_message(
-                        content="<@948699796066144337> WE HAVE A PROBLEM",
-                        username="Scrypt",
-                        avatar_url="https://stux.ai/static/cryy.png",
-                        embeds=[
-                            Embed(
-                                author=Author(name=f"{ctx.author.name}"),
-                                title=f"Now Playing Error in {ctx.author.channel.name}'s Channel",
-                                description=f"Error: {str(e)}\nStack trace:\n{traceback.format_exc()}",
-                                timestamp=datetime.datetime.now(),
-                            )
-                        ]
-                    )
+    @commands.command(name="mystats", aliases=[])
+    async def mystats_command(self, ctx):
+        state = self._channel(ctx)
+        if self._check_permissions(ctx=ctx, command_name="songrequest_command"):
+            stats = state.request_log.user_stats(ctx.author.name)
+            requests = sum(stats.values())
+            if not requests:
+                return await ctx.send(f"@{ctx.author.name} You haven't requested any songs this stream yet!")
+            message = (
+                f"@{ctx.author.name} You've made {requests} requests this stream, "
+                f"{stats[request_log.QUEUED]} added to the queue"
+            )
+            total = state.request_log.user_total(ctx.author.name)
+            if total is not None:
+                message += f" ({total} all time)"
+            await ctx.send(message + "!")
         else:
             return await ctx.send(f"@{ctx.author.name} You don't have permission to do that!")
 
@@ -295,144 +374,138 @@ class Bot(commands.Bot):
         if self._check_permissions(ctx=ctx, command_name="songrequest_command"):
             if not song:
                 return await self.help_command(ctx)
-        
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    song_uri = None
-                    if re.match(self.URL_REGEX, song):
-                        if not await is_valid_media_url(song, ctx):
-                            return
-                        song_uri = song
-                        await self.chat_song_request(ctx, song_uri, song_uri, album=False)
-                    else:
-                        await self.chat_song_request(ctx, song, song_uri, album=False)
-
-                    logging.info(f"Song request successful for user: {ctx.author.name}, Song: {song}")
-                    return  # Success! Exit the retry loop
-                    
-                except (req.exceptions.ConnectionError, 
-                        urllib3.exceptions.ProtocolError,
-                        spotipy.exceptions.SpotifyException) as e:
-                    
-                    if attempt < max_retries - 1:  # Still have retries left
-                        logging.info(f"Spotify connection failed, attempt {attempt + 1}/{max_retries}. Recreating client...")
-                        # Recreate the Spotify client
-                        self.sp = spotipy.Spotify(
-                            auth_manager=SpotifyOAuth(
-                                client_id=self.config.spotify_client_id,
-                                client_secret=self.config.spotify_secret,
-                                redirect_uri="http://127.0.0.1:8080",
-                                cache_path=CACHE,
-                                scope=[
-                                    "user-modify-playback-state",
-                                    "user-read-currently-playing",
-                                    "user-read-playback-state",
-                                    "user-read-recently-played",
-                                ],
-                            )
-                        )
-                        await asyncio.sleep(2 ** attempt)
-                        continue
-                    
-                    # If we're here, we've exhausted all retries
-                    logging.error(f"Error: {str(e)}\nStack trace:\n{traceback.format_exc()}")
-                    await ctx.send(f"@{ctx.author.name}, there was an error with your request after {max_retries} attempts!")
-                    DiscordWebhook.send_message(
-                        content="<@948699796066144337> WE HAVE A PROBLEM",
-                        username="Scrypt",
-                        avatar_url="https://stux.ai/static/cryy.png",
-                        embeds=[
-                            Embed(
-                                author=Author(name=f"{ctx.author.name}"),
-                                title=f"Song Request Error in {ctx.author.channel.name}'s Channel",
-                                description=f"Error: {str(e)}\nStack trace:\n{traceback.format_exc()}",
-                                timestamp=datetime.datetime.now(),
-                            )
-                        ]
-                    )
+            self._set_priority(ctx, Priority.REQUEST)
+            started = time.monotonic()
+
+            try:
+                song_uri = None
+                link = parse_media_link(song)
+                if link.kind != LinkKind.TEXT:
+                    if not await is_valid_media_link(link, ctx):
+                        return
+                    song_uri = song
+                    await self.chat_song_request(ctx, song_uri, song_uri, album=False, started=started)
+                else:
+                    await self.chat_song_request(ctx, song, song_uri, album=False, started=started)
+
+                logging.info(f"Song request successful for user: {ctx.author.name}, Song: {song}")
+
+            except CircuitOpenError as e:
+                logging.warning(f"Song request from {ctx.author.name} skipped: {e}")
+                self._log_request(ctx, song, request_log.SPOTIFY_DOWN, started)
+                await ctx.send(f"@{ctx.author.name}, Spotify isn't responding right now, try again in a bit!")
+
+            except (aiohttp.ClientError,
+                    asyncio.TimeoutError,
+                    SpotifyException) as e:
+                # transient failures were already retried by the Spotify client
+                logging.error(f"Error: {str(e)}\nStack trace:\n{traceback.format_exc()}")
+                self._log_request(ctx, song, request_log.ERROR, started)
+                await ctx.send(f"@{ctx.author.name}, there was an error with your request!")
+                self.alerts.alert(
+                    title=f"Song Request Error in {ctx.channel.name}'s Channel",
+                    error=error_summary(e),
+                    details=f"{e}\nStack trace:\n{traceback.format_exc()}",
+                    author=ctx.author.name,
+                )
         else:
             return await ctx.send(f"@{ctx.author.name} You don't have permission to do that!")
 
-    async def chat_song_request(self, ctx, song, song_uri, album: bool, requests=None):
-        blacklisted_users = read_json("blacklist_user")["users"]
-        if ctx.author.name.lower() in blacklisted_users:
+    async def _resolve_song(self, ctx, song, link: Optional[MediaLink]) -> Optional[dict]:
+        """
+        Resolve a request (search text, Spotify link or YouTube link) to a track.
+
+        :return: dict: compact track object, None if nothing matched
+        """
+        state = self._channel(ctx)
+        if link is None:
+            return await self._search_track(song, state)
+
+        if link.kind == LinkKind.SPOTIFY_TRACK:
+            return await self._get_track(link.id, state)
+
+        if link.kind == LinkKind.SPOTIFY_SHORT:  # the only link type that needs the network to find its track
+            if link.id not in self.short_links:
+                await ctx.send(f'@{ctx.author.name} Mobile link detected, attempting to get full url.')
+            track_id = await self.short_links.resolve(link)
+            return await self._get_track(track_id, state) if track_id else None
+
+        if link.kind == LinkKind.YOUTUBE_VIDEO:
+            track_id = self.youtube.get_track_id(link.id)
+            if track_id == NO_RESULT:
+                return None
+            if track_id is not None:
+                return await self._get_track(track_id, state)
+
+            metadata = await self.youtube.metadata(link)
+            if metadata is None:
+                return None
+            query = search_query(*metadata)
+            logging.info(f"YouTube Link Detected <{link.text}> - Searching '{query}' on Spotify as fallback")
+            await ctx.send(f"YouTube Link Detected - Searching song name on Spotify as fallback")
+            track = await self._search_track(query, state)
+            self.youtube.set_track_id(link.id, track["id"] if track else None)
+            return track
+
+        return await self._get_track(link.text, state)
+
+    async def chat_song_request(self, ctx, song, song_uri, album: bool, requests=None, started: float = None):
+        state = self._channel(ctx)
+        if started is None:
+            started = time.monotonic()
+        if state.blacklists.is_user_blacklisted(ctx.author.name):
             logging.warning(f"Blacklisted user @{ctx.author.name} attempted request: Song:{song} - URI:{song_uri}")
+            self._log_request(ctx, song, request_log.USER_BLACKLISTED, started)
             await ctx.send("You are blacklisted from requesting songs.")
         else:
-            jscon = read_json("blacklist")
-
-            if song_uri is None:
-                data = self.sp.search(song, limit=1, type="track", market="US")
-                song_uri = data["tracks"]["items"][0]["uri"]
-
-            elif re.match(self.URL_REGEX, song_uri):
-                if 'spotify' in song_uri:
-                    if '.link/' in song_uri:  # todo: better way to handle this?
-                        ctx.send(
-                            f'@{ctx.author.name} Mobile link detected, attempting to get full url.')  # todo: verify this is sending?????
-                        req_data = req.get(
-                            song_uri,
-                            allow_redirects=True,
-                            headers={
-                                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, '
-                                              'like Gecko) Chrome/119.0.0.0 Safari/537.36'
-                            }
-
-                        )
-                        data = self.sp.track(req_data.url)
-                    else:
-                        data = self.sp.track(song_uri)
-                    song_uri = data["uri"]
-                    song_uri = song_uri.replace("spotify:track:", "")
-                if 'youtube' in song_uri or 'youtu.be' in song_uri:
-                    song_uri = song_uri.strip()  # Removing any leading/trailing whitespace
-                    encoded_url = quote(song_uri,
-                                        safe=":/?&=")  # Safely encode URL special characters except for a few allowed
-                    with url_request.urlopen(f'https://noembed.com/embed?url={encoded_url}') as url:
-                        data = json.load(url)
-                        title = data['title'], data['author_name']
-                    logging.info(f"YouTube Link Detected <{encoded_url}> - Searching song name on Spotify as fallback")
-                    await ctx.send(f"YouTube Link Detected - Searching song name on Spotify as fallback")
-                    await self.chat_song_request(ctx, f'{title}', song_uri=None, album=False)
-                    return
-
-            song_id = song_uri.replace("spotify:track:", "")
-
-            if not album:
-                data = self.sp.track(song_id)
-                song_name = data["name"]
-                song_artists = data["artists"]
-                song_artists_names = [artist["name"] for artist in song_artists]
-                duration = data["duration_ms"] / 60000
-
-            if song_uri != "not found":
-                if song_id in jscon["blacklist"]:
-                    logging.warning(f"User @{ctx.author.name} requested blacklisted song: {song_id}")
-                    return await ctx.send(f"@{ctx.author.name} That song is blacklisted.")
-
-                if duration > 17:
-                    return await ctx.send(f"@{ctx.author.name} Send a shorter song please! :3")
-
-                if self.config.rate_limit:
-                    if (ctx.author.name in self.request_history
-                            and ctx.author.name.lower() != self.config.channel.lower()):
-                        if (
-                                datetime.datetime.now() - self.request_history[ctx.author.name]["last_request_time"]
-                        ).seconds < 300:
-                            return await ctx.send(f"@{ctx.author.name} You need to wait 5 minutes between requests!")
-
-                        self.request_history[ctx.author.name]["last_request_time"] = datetime.datetime.now()
-                        self.request_history[ctx.author.name]["last_requested_song_id"] = song_id
-                        self.last_song = song_id
-                    else:
-                        self.request_history[ctx.author.name] = {
-                            "last_request_time": datetime.datetime.now(),
-                            "last_requested_song_id": song_id
-                        }
-                        self.last_song = song_id
-
-                self.sp.add_to_queue(song_uri)
-                await ctx.send(
-                    f"@{ctx.author.name}, Your song ({song_name} by {', '.join(song_artists_names)}) [ {data['external_urls']['spotify']} ] has been added to the queue!"
-                )
\ No newline at end of file
+            # identical requests arriving together share one resolution
+            link = parse_media_link(song_uri) if song_uri else None
+            request_key = f"{link.kind.value}:{link.id or link.text}" if link else normalize_query(song)
+            data = await state.request_coalescer.resolve(
+                request_key, lambda: self._resolve_song(ctx, song, link)
+            )
+            if data is None:
+                logging.info(f"No Spotify results for request: {song}")
+                self._log_request(ctx, song, request_log.NOT_FOUND, started)
+                return await ctx.send(f"@{ctx.author.name} Couldn't find that song on Spotify.")
+
+            song_id = data["id"]
+            song_name = data["name"]
+            song_artists = data["artists"]
+            song_artists_names = [artist["name"] for artist in song_artists]
+            duration = data["duration_ms"] / 60000
+
+            if state.blacklists.is_song_blacklisted(song_id):
+                logging.warning(f"User @{ctx.author.name} requested blacklisted song: {song_id}")
+                self._log_request(ctx, song, request_log.SONG_BLACKLISTED, started, data)
+                return await ctx.send(f"@{ctx.author.name} That song is blacklisted.")
+
+            if duration > 17:
+                self._log_request(ctx, song, request_log.TOO_LONG, started, data)
+                return await ctx.send(f"@{ctx.author.name} Send a shorter song please! :3")
+
+            if not state.request_coalescer.claim(song_id):
+                logging.info(f"Duplicate request from @{ctx.author.name} for already queued song: {song_id}")
+                self._log_request(ctx, song, request_log.DUPLICATE, started, data)
+                return await ctx.send(f"@{ctx.author.name}, {song_name} is already in the queue!")
+
+            if state.config.rate_limit:
+                retry_after = state.rate_limiter.hit(ctx.author.name.lower(), state.request_limit(ctx.author))
+                if retry_after:
+                    state.request_coalescer.release(song_id)
+                    self._log_request(ctx, song, request_log.RATE_LIMITED, started, data)
+                    wait_min, wait_sec = divmod(int(retry_after) + 1, 60)
+                    return await ctx.send(
+                        f"@{ctx.author.name} You need to wait {wait_min} mins, {wait_sec} secs before your next request!"
+                    )
+            state.last_song = song_id
+
+            try:
+                await state.sp.add_to_queue(data["uri"])
+            except Exception:
+                state.request_coalescer.release(song_id)
+                raise
+            self._log_request(ctx, song, request_log.QUEUED, started, data)
+            await ctx.send(
+                f"@{ctx.author.name}, Your song ({song_name} by {', '.join(song_artists_names)}) [ {data['external_urls']['spotify']} ] has been added to the queue!"
+            )
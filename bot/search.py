@@ -0,0 +1,57 @@
+# Standard Library
+import re
+import unicodedata
+from typing import Optional
+
+# Local
+from bot.cache import TTLCache
+
+NO_RESULT = ""  # cached when Spotify has no match, so a miss isn't confused with "not cached"
+
+_PART_SEPARATOR_REGEX = re.compile(r"\s+[-–—]\s+")
+_PUNCTUATION_REGEX = re.compile(r"[^\w\s]+")
+_WHITESPACE_REGEX = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Cache key for a free-text song request.
+
+    Case-folds, strips accents and punctuation, collapses whitespace, and sorts the parts of "song - artist" so
+    the reversed order maps to the same key. "by" isn't a separator, titles like "Stand by Me" contain it.
+
+    :param query: raw !sr text
+    :return: str: normalized key
+    """
+    raw = query.casefold().strip()
+    query = unicodedata.normalize("NFKD", raw)
+    query = "".join(char for char in query if not unicodedata.combining(char))
+
+    parts = []
+    for part in _PART_SEPARATOR_REGEX.split(query):
+        part = _WHITESPACE_REGEX.sub(" ", _PUNCTUATION_REGEX.sub(" ", part)).strip()
+        if part:
+            parts.append(part)
+
+    # all punctuation or emoji: the raw text is the only thing that tells "???" from "💀💀"
+    return " | ".join(sorted(parts)) or raw
+
+
+class SearchCache:
+    """
+    Normalized query -> track ID. "No results" answers are cached too, with a shorter TTL.
+    """
+
+    def __init__(self, maxsize: int = 2000, ttl: float = 60 * 60, negative_ttl: float = 120):
+        self.negative_ttl = negative_ttl
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, query: str) -> Optional[str]:
+        """:return: track id, NO_RESULT for a cached miss, or None if the query isn't cached"""
+        return self._cache.get(normalize_query(query))
+
+    def set(self, query: str, track_id: Optional[str]):
+        if track_id:
+            self._cache.set(normalize_query(query), track_id)
+        else:
+            self._cache.set(normalize_query(query), NO_RESULT, ttl=self.negative_ttl)
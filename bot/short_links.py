@@ -0,0 +1,114 @@
+# Standard Library
+import asyncio
+import logging
+from typing import Optional
+from urllib.parse import urljoin
+
+# Third-Party
+import aiohttp
+
+# Local
+from bot.cache import TTLCache
+from bot.coalesce import SingleFlight
+from bot.media_links import LinkKind, MediaLink, parse_media_link
+
+NOT_A_TRACK = ""  # cached when a short link leads somewhere other than a track
+
+_REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+
+
+class ShortLinkResolver:
+    """
+    Resolves spotify.link / spotify.app.link short links (what the mobile app shares) to a track ID.
+
+    Redirects are followed by hand with HEAD requests, so only headers are transferred and the landing page is
+    never downloaded, and the whole chain has to finish within `timeout` seconds. Resolved codes are cached,
+    and concurrent requests for the same code share one lookup.
+    """
+
+    USER_AGENT = (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/119.0.0.0 Safari/537.36"
+    )
+
+    def __init__(self, timeout: float = 5.0, max_redirects: int = 5, maxsize: int = 1000,
+                 ttl: float = 7 * 24 * 60 * 60, negative_ttl: float = 10 * 60):
+        self.timeout = timeout
+        self.max_redirects = max_redirects
+        self.negative_ttl = negative_ttl
+
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._resolving = SingleFlight()
+        self._session = None  # type: Optional[aiohttp.ClientSession]
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"User-Agent": self.USER_AGENT},
+            )
+        return self._session
+
+    def __contains__(self, code: str) -> bool:
+        return code in self._cache
+
+    async def resolve(self, link: MediaLink) -> Optional[str]:
+        """
+        :param link: SPOTIFY_SHORT link from parse_media_link
+        :return: str: track ID, None if the link doesn't lead to a track or couldn't be followed in time
+        """
+        track_id = self._cache.get(link.id)
+        if track_id is None:
+            track_id = await self._resolving.do(link.id, lambda: self._lookup(link))
+        return track_id or None
+
+    async def _lookup(self, link: MediaLink) -> Optional[str]:
+        try:
+            track_id = await asyncio.wait_for(self._follow(link.text), self.timeout)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            # not cached, the next request for this link tries again
+            logging.warning(f"Couldn't resolve short link {link.text}: {type(e).__name__} {e}")
+            return None
+
+        if track_id is None:
+            logging.info(f"Short link {link.text} doesn't point to a track")
+            self._cache.set(link.id, NOT_A_TRACK, ttl=self.negative_ttl)
+        else:
+            self._cache.set(link.id, track_id)
+        return track_id
+
+    async def _follow(self, url: str) -> Optional[str]:
+        session = self._get_session()
+        if not url.lower().startswith(("http://", "https://")):
+            url = f"https://{url}"
+
+        for _ in range(self.max_redirects):
+            location = await self._next_location(session, url)
+            if location is None:
+                return None
+            url = urljoin(url, location)
+
+            target = parse_media_link(url)
+            if target.kind == LinkKind.SPOTIFY_TRACK:
+                return target.id
+            if target.kind != LinkKind.SPOTIFY_SHORT and target.kind != LinkKind.OTHER_URL:
+                return None  # landed on a Spotify page that isn't a track
+        return None
+
+    @staticmethod
+    async def _next_location(session: aiohttp.ClientSession, url: str) -> Optional[str]:
+        """Location header of one hop, None if the response isn't a redirect. The body is never read."""
+        async with session.head(url, allow_redirects=False) as response:
+            status, location = response.status, response.headers.get("Location")
+        if status in (405, 501):
+            # some hosts refuse HEAD, a GET whose body we never read costs about the same
+            async with session.get(url, allow_redirects=False) as response:
+                status, location = response.status, response.headers.get("Location")
+        if status not in _REDIRECT_STATUSES:
+            return None
+        return location
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -0,0 +1,186 @@
+# Standard Library
+import logging
+from typing import List, Optional
+
+# Third-Party
+import aiohttp
+from spotipy.exceptions import SpotifyException
+from spotipy.oauth2 import SpotifyOAuth
+
+# Local
+from bot.auth import AtomicCacheFileHandler, SpotifyTokenManager
+from bot.media_links import SPOTIFY_KINDS, is_track_id, parse_media_link
+from bot.resilience import RetryPolicy
+from bot.scheduler import SpotifyScheduler
+from constants import CACHE
+
+SCOPES = [
+    "user-modify-playback-state",
+    "user-read-currently-playing",
+    "user-read-playback-state",
+    "user-read-recently-played",
+]
+
+
+def create_auth_manager(config, cache_path: str = CACHE) -> SpotifyOAuth:
+    return SpotifyOAuth(
+        client_id=config.spotify_client_id,
+        client_secret=config.spotify_secret,
+        redirect_uri="http://127.0.0.1:8080",
+        cache_handler=AtomicCacheFileHandler(cache_path),
+        scope=SCOPES,
+    )
+
+
+def compact_track(track: dict) -> dict:
+    """Strip a track object down to the fields the bot reads, keeps cache entries and snapshots small."""
+    return {
+        "id": track["id"],
+        "uri": track["uri"],
+        "name": track["name"],
+        "artists": [{"name": artist["name"]} for artist in track["artists"]],
+        "duration_ms": track["duration_ms"],
+        "external_urls": {"spotify": track["external_urls"]["spotify"]},
+    }
+
+
+def get_id(type_: str, value: str) -> str:
+    """
+    Pull a Spotify ID out of a URI, open.spotify.com URL or raw ID without any network call.
+    Mirrors spotipy's Spotify._get_id.
+
+    :param type_: expected object type (track, album, ...)
+    :param value: uri / url / id
+    :return: str: base62 id, always 22 characters so a bad one never reaches a batched lookup
+    """
+    link = parse_media_link(value)
+    if link.kind in SPOTIFY_KINDS.values():
+        if link.kind != SPOTIFY_KINDS.get(type_):
+            raise SpotifyException(400, -1, f"Unexpected Spotify {link.kind.value} link, expected {type_}.")
+        if not is_track_id(link.id):
+            raise SpotifyException(400, -1, f"Invalid Spotify {type_} ID.")
+        return link.id
+
+    if is_track_id(link.text):
+        return link.text
+
+    raise SpotifyException(400, -1, "Unsupported URL / URI.")
+
+
+class _RateLimited(Exception):
+    pass
+
+
+class AsyncSpotify:
+    """
+    Small asyncio client for the handful of Spotify Web API endpoints the bot uses.
+
+    Every call goes through one pooled keep-alive aiohttp session and a SpotifyScheduler that caps how many
+    requests are in flight, orders them by priority and holds everything back while a 429 Retry-After is active.
+    A slow Spotify response only suspends the coroutine that made it instead of the whole event loop.
+    Transient failures are retried by a shared RetryPolicy whose circuit breaker makes calls fail fast with
+    CircuitOpenError while Spotify is down. Access tokens come from a SpotifyTokenManager, which refreshes them
+    in the background.
+
+    Errors are raised as spotipy.SpotifyException so callers can keep catching the same exception type.
+    """
+
+    API_BASE = "https://api.spotify.com/v1/"
+
+    def __init__(self, token_manager: SpotifyTokenManager, requests_timeout=10, max_connections=20,
+                 scheduler: SpotifyScheduler = None, policy: RetryPolicy = None, max_rate_limit_retries=3):
+        self.token_manager = token_manager
+        self.requests_timeout = requests_timeout
+        self.max_connections = max_connections
+        self.scheduler = scheduler or SpotifyScheduler()
+        self.policy = policy or RetryPolicy()
+        self.max_rate_limit_retries = max_rate_limit_retries
+
+        self._session = None  # type: Optional[aiohttp.ClientSession]
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # created lazily so the session belongs to the loop the bot actually runs on
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=self.requests_timeout),
+            )
+        return self._session
+
+    async def _request(self, method: str, path: str, params: Optional[dict] = None):
+        if params:
+            params = {key: str(value) for key, value in params.items() if value is not None}
+        return await self.policy.call(
+            lambda: self._scheduled_request(method, path, params), idempotent=method == "GET"
+        )
+
+    async def _scheduled_request(self, method: str, path: str, params: Optional[dict]):
+        session = self._get_session()
+        headers = {"Authorization": f"Bearer {await self.token_manager.get_token()}"}
+
+        for attempt in range(self.max_rate_limit_retries + 1):
+            await self.scheduler.acquire()
+            try:
+                return await self._send(session, method, path, params, headers,
+                                        retry_429=attempt < self.max_rate_limit_retries)
+            except _RateLimited:
+                continue  # the scheduler holds this call back until Retry-After has passed
+            finally:
+                self.scheduler.release()
+
+    async def _send(self, session: aiohttp.ClientSession, method: str, path: str, params: Optional[dict],
+                    headers: dict, retry_429: bool):
+        async with session.request(method, self.API_BASE + path, params=params, headers=headers) as response:
+            if response.status == 429:
+                # hold back every other call too, even when this one has run out of retries
+                self.scheduler.block(float(response.headers.get("Retry-After", 1)))
+                if retry_429:
+                    raise _RateLimited()
+
+            if response.status >= 400:
+                try:
+                    body = await response.json(content_type=None)
+                    msg = body["error"]["message"]
+                except (ValueError, KeyError, TypeError):
+                    msg = response.reason
+                logging.debug(f"Spotify {method} {path} failed: {response.status} {msg}")
+                raise SpotifyException(
+                    response.status,
+                    -1,
+                    f"{response.url}:\n {msg}",
+                    reason=response.reason,
+                    headers=dict(response.headers),
+                )
+
+            if response.status == 204:
+                return None
+            body = await response.read()
+            if not body:
+                return None
+            return await response.json(content_type=None)
+
+    async def search(self, q: str, limit=10, offset=0, type="track", market=None) -> dict:
+        return await self._request(
+            "GET", "search", params={"q": q, "limit": limit, "offset": offset, "type": type, "market": market}
+        )
+
+    async def track(self, track_id: str, market=None) -> dict:
+        return await self._request("GET", f"tracks/{get_id('track', track_id)}", params={"market": market})
+
+    async def tracks(self, track_ids: List[str], market=None) -> dict:
+        ids = ",".join(get_id("track", track_id) for track_id in track_ids)
+        return await self._request("GET", "tracks", params={"ids": ids, "market": market})
+
+    async def add_to_queue(self, uri: str, device_id=None):
+        uri = f"spotify:track:{get_id('track', uri)}"
+        return await self._request("POST", "me/player/queue", params={"uri": uri, "device_id": device_id})
+
+    async def currently_playing(self, market=None, additional_types=None) -> Optional[dict]:
+        return await self._request(
+            "GET", "me/player/currently-playing", params={"market": market, "additional_types": additional_types}
+        )
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
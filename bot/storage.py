@@ -0,0 +1,228 @@
+# Standard Library
+import gzip
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Optional
+
+# Local
+from bot.config_service import get_config_service
+from constants import DATABASE, SONG_BLACKLIST, TRACK_CACHE, USER_BLACKLIST
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS banned_users (
+    name TEXT PRIMARY KEY,
+    added_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS banned_tracks (
+    track_id TEXT PRIMARY KEY,
+    added_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS request_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    requested_at REAL NOT NULL,
+    user TEXT NOT NULL,
+    query TEXT NOT NULL,
+    track_id TEXT,
+    track_name TEXT,
+    outcome TEXT NOT NULL,
+    latency_ms REAL
+);
+CREATE INDEX IF NOT EXISTS request_history_requested_at ON request_history (requested_at);
+CREATE INDEX IF NOT EXISTS request_history_user ON request_history (user, requested_at);
+CREATE INDEX IF NOT EXISTS request_history_track ON request_history (track_id, requested_at);
+CREATE INDEX IF NOT EXISTS request_history_outcome ON request_history (outcome, requested_at);
+CREATE TABLE IF NOT EXISTS track_cache (
+    track_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS track_cache_expires_at ON track_cache (expires_at);
+"""
+
+# banned_* table -> its key column
+_BAN_TABLES = {"banned_users": "name", "banned_tracks": "track_id"}
+
+
+class SQLiteStore:
+    """
+    Embedded SQLite store for blacklists, request history and cached track metadata.
+
+    Runs in WAL mode, so the GUI and the bot thread can read while the other writes. sqlite3 connections
+    can't be shared between threads, so each thread gets its own.
+    """
+
+    def __init__(self, path: str = DATABASE):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)  # autocommit, explicit transactions
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")  # durable at checkpoints, fast commits
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def execute(self, sql: str, params: Iterable = ()) -> sqlite3.Cursor:
+        return self._connect().execute(sql, params)
+
+    def executemany(self, sql: str, rows: Iterable) -> None:
+        conn = self._connect()
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(sql, rows)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        self.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    # blacklists
+
+    def is_banned(self, table: str, value: str) -> bool:
+        column = _BAN_TABLES[table]
+        return self.execute(f"SELECT 1 FROM {table} WHERE {column} = ?", (value,)).fetchone() is not None
+
+    def ban(self, table: str, value: str) -> bool:
+        """:return: bool: False if already banned"""
+        column = _BAN_TABLES[table]
+        cursor = self.execute(
+            f"INSERT OR IGNORE INTO {table} ({column}, added_at) VALUES (?, ?)", (value, time.time())
+        )
+        return cursor.rowcount > 0
+
+    def unban(self, table: str, value: str) -> bool:
+        """:return: bool: False if it wasn't banned"""
+        column = _BAN_TABLES[table]
+        return self.execute(f"DELETE FROM {table} WHERE {column} = ?", (value,)).rowcount > 0
+
+    def banned(self, table: str) -> List[str]:
+        column = _BAN_TABLES[table]
+        return [row[0] for row in self.execute(f"SELECT {column} FROM {table} ORDER BY added_at")]
+
+    def count(self, table: str) -> int:
+        return self.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    # request history
+
+    def add_requests(self, rows: Iterable):
+        """:param rows: (requested_at, user, query, track_id, track_name, outcome, latency_ms) tuples"""
+        self.executemany(
+            "INSERT INTO request_history (requested_at, user, query, track_id, track_name, outcome, latency_ms) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+    # track metadata cache
+
+    def save_tracks(self, entries: Iterable) -> int:
+        """:param entries: (track_id, expires_at, compact track) tuples, as TTLCache.entries() returns them"""
+        rows = [
+            (track_id, json.dumps(data, separators=(",", ":")), expires_at) for track_id, expires_at, data in entries
+        ]
+        self.executemany("INSERT OR REPLACE INTO track_cache (track_id, data, expires_at) VALUES (?, ?, ?)", rows)
+        self.execute("DELETE FROM track_cache WHERE expires_at <= ?", (time.time(),))
+        return len(rows)
+
+    def load_tracks(self, limit: int) -> list:
+        """:return: list: unexpired (track_id, expires_at, compact track), soonest expiry first"""
+        rows = self.execute(
+            "SELECT track_id, expires_at, data FROM track_cache WHERE expires_at > ? "
+            "ORDER BY expires_at DESC LIMIT ?",
+            (time.time(), limit),
+        ).fetchall()
+        return [(track_id, expires_at, json.loads(data)) for track_id, expires_at, data in reversed(rows)]
+
+    def migrate_json(self, user_file: str = USER_BLACKLIST, song_file: str = SONG_BLACKLIST,
+                     track_cache: Optional[str] = TRACK_CACHE):
+        """
+        One-time import of the JSON blacklists and the track cache snapshot. The JSON files are left in place,
+        so switching back to the json backend still works.
+
+        :param user_file: user blacklist to import
+        :param song_file: song blacklist to import
+        :param track_cache: track cache snapshot to import, None to skip it
+        """
+        if self.get_meta("json_migrated"):
+            return
+
+        now = time.time()
+        sources = ((user_file, "users", "banned_users"), (song_file, "blacklist", "banned_tracks"))
+        for file, key, table in sources:
+            try:
+                with open(file) as f:
+                    values = json.load(f).get(key, [])
+            except FileNotFoundError:
+                continue
+            except (OSError, ValueError) as e:
+                logging.warning(f"Skipping {file} in SQLite migration: {e}")
+                continue
+            if table == "banned_users":
+                values = [value.lower() for value in values]
+            column = _BAN_TABLES[table]
+            # keep the file's order through added_at
+            self.executemany(
+                f"INSERT OR IGNORE INTO {table} ({column}, added_at) VALUES (?, ?)",
+                [(value, now + i * 1e-6) for i, value in enumerate(values)],
+            )
+            logging.info(f"Migrated {len(values)} entries from {os.path.basename(file)} to SQLite")
+
+        if track_cache is not None:
+            try:
+                with gzip.open(track_cache, "rt", encoding="utf-8") as f:
+                    self.save_tracks(json.load(f))
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as e:
+                logging.warning(f"Skipping track cache in SQLite migration: {e}")
+
+        self.set_meta("json_migrated", str(now))
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def use_sqlite() -> bool:
+    """Whether the config picks the SQLite backend. Only read at startup, switching needs a restart."""
+    config_service = get_config_service()
+    if config_service.config is None:
+        try:
+            config_service.load()
+        except (OSError, ValueError):
+            return False
+    return config_service.config.storage == "sqlite"
+
+
+def get_store() -> Optional[SQLiteStore]:
+    """Process-wide store if the SQLite backend is enabled, migrated from JSON on first use. None otherwise."""
+    global _store
+    with _store_lock:
+        if _store is None and use_sqlite():
+            _store = SQLiteStore()
+            _store.migrate_json()
+        return _store
@@ -0,0 +1,118 @@
+# Standard Library
+import asyncio
+import logging
+import re
+from typing import Optional, Tuple
+
+# Third-Party
+import aiohttp
+
+# Local
+from bot.cache import TTLCache
+from bot.coalesce import SingleFlight
+from bot.media_links import MediaLink
+from bot.search import NO_RESULT
+
+# bracketed bits that describe the upload rather than the song: (Official Video), [Lyrics], (HD), (feat. X) ...
+_NOISE_WORDS = (
+    r"official|video|audio|lyrics?|visuali[sz]er|music|mv|m/v|hd|hq|4k|remaster(?:ed)?|explicit|clean|"
+    r"live|performance|color coded|ft\.?|feat\.?|featuring"
+)
+_BRACKET_NOISE_REGEX = re.compile(rf"[(\[【][^)\]】]*\b(?:{_NOISE_WORDS})\b[^)\]】]*[)\]】]", re.IGNORECASE)
+_FEATURING_REGEX = re.compile(r"\s+(?:ft\.?|feat\.?|featuring)\s+[^-|(\[]*", re.IGNORECASE)
+_PIPE_SUFFIX_REGEX = re.compile(r"\s*[|│].*$")
+_CHANNEL_SUFFIX_REGEX = re.compile(r"(?:\s*-\s*topic|vevo|\s+official)$", re.IGNORECASE)
+_WHITESPACE_REGEX = re.compile(r"\s+")
+
+
+def clean_title(title: str) -> str:
+    """
+    Strip upload noise from a YouTube title so it works as a Spotify search.
+    "Artist - Song (Official Video) ft. Someone | Label" -> "Artist - Song"
+    """
+    title = _PIPE_SUFFIX_REGEX.sub("", title)
+    title = _BRACKET_NOISE_REGEX.sub(" ", title)
+    title = _FEATURING_REGEX.sub(" ", title)
+    title = title.replace('"', " ")
+    return _WHITESPACE_REGEX.sub(" ", title).strip(" -")
+
+
+def search_query(title: str, channel: str) -> str:
+    """
+    Spotify search text for a video. Titles already shaped "Artist - Song" are used as is, otherwise the channel
+    name (minus " - Topic" / "VEVO") stands in for the artist.
+    """
+    title = clean_title(title)
+    if " - " in title or not channel:
+        return title
+    channel = _CHANNEL_SUFFIX_REGEX.sub("", channel).strip()
+    return f"{title} {channel}" if channel and channel.lower() not in title.lower() else title
+
+
+class YouTubeResolver:
+    """
+    Looks up YouTube videos through noembed's oEmbed endpoint, asynchronously and within `timeout` seconds.
+
+    Caches video ID -> (title, channel) and video ID -> Spotify track ID, so a video that has been requested
+    before resolves without any network call. Concurrent lookups of the same video share one request.
+    """
+
+    OEMBED_URL = "https://noembed.com/embed"
+
+    def __init__(self, timeout: float = 5.0, maxsize: int = 2000, ttl: float = 7 * 24 * 60 * 60,
+                 negative_ttl: float = 10 * 60):
+        self.timeout = timeout
+        self.negative_ttl = negative_ttl
+
+        self._metadata = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._tracks = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._fetching = SingleFlight()
+        self._session = None  # type: Optional[aiohttp.ClientSession]
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self._session
+
+    def get_track_id(self, video_id: str) -> Optional[str]:
+        """:return: str: cached track ID, NO_RESULT if Spotify had no match, None if not resolved yet"""
+        return self._tracks.get(video_id)
+
+    def set_track_id(self, video_id: str, track_id: Optional[str]):
+        if track_id is None:
+            self._tracks.set(video_id, NO_RESULT, ttl=self.negative_ttl)
+        else:
+            self._tracks.set(video_id, track_id)
+
+    async def metadata(self, link: MediaLink) -> Optional[Tuple[str, str]]:
+        """
+        :param link: YOUTUBE_VIDEO link from parse_media_link
+        :return: (title, channel), None if the video doesn't exist or noembed didn't answer in time
+        """
+        metadata = self._metadata.get(link.id)
+        if metadata is None:
+            metadata = await self._fetching.do(link.id, lambda: self._fetch(link.id))
+        return metadata
+
+    async def _fetch(self, video_id: str) -> Optional[Tuple[str, str]]:
+        # canonical url, so every link form for the same video looks identical to noembed
+        params = {"url": f"https://www.youtube.com/watch?v={video_id}"}
+        try:
+            async with self._get_session().get(self.OEMBED_URL, params=params) as response:
+                response.raise_for_status()
+                data = await asyncio.wait_for(response.json(content_type=None), self.timeout)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            logging.warning(f"Couldn't look up YouTube video {video_id}: {type(e).__name__} {e}")
+            return None
+
+        if "title" not in data:  # noembed answers 200 with an "error" field for missing / private videos
+            logging.info(f"noembed has no data for YouTube video {video_id}: {data.get('error')}")
+            return None
+        metadata = data["title"], data.get("author_name", "")
+        self._metadata.set(video_id, metadata)
+        return metadata
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -1,16 +1,43 @@
 import os
+import sys
 from enum import Enum
 
-SCRYPTTUNES_DATA = os.path.join(os.getenv("LOCALAPPDATA"), "Stux\\ScryptTunes\\")
-SCRYPTTUNES_DATA_CONFIG = os.path.join(
-    os.getenv("LOCALAPPDATA"), "Stux\\ScryptTunes\\config"
-)
+
+def _data_dirs():
+    """
+    (data, config) folders. SCRYPTTUNES_HOME overrides both, handy for servers and containers.
+    Windows keeps the LOCALAPPDATA\\Stux\\ScryptTunes layout, everywhere else follows the XDG base directory spec.
+    """
+    home = os.getenv("SCRYPTTUNES_HOME")
+    if home:
+        return home, os.path.join(home, "config")
+    if sys.platform == "win32" and os.getenv("LOCALAPPDATA"):
+        data = os.path.join(os.getenv("LOCALAPPDATA"), "Stux", "ScryptTunes")
+        return data, os.path.join(data, "config")
+    data_home = os.getenv("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    config_home = os.getenv("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(data_home, "scrypttunes"), os.path.join(config_home, "scrypttunes")
+
+
+SCRYPTTUNES_DATA, SCRYPTTUNES_DATA_CONFIG = _data_dirs()
 
 
 SONG_BLACKLIST = os.path.join(SCRYPTTUNES_DATA_CONFIG, "blacklist.json")
 USER_BLACKLIST = os.path.join(SCRYPTTUNES_DATA_CONFIG, "blacklist_user.json")
 CONFIG = os.path.join(SCRYPTTUNES_DATA_CONFIG, "config.json")
 CACHE = os.path.join(SCRYPTTUNES_DATA_CONFIG, ".cache")
+TRACK_CACHE = os.path.join(SCRYPTTUNES_DATA_CONFIG, "track_cache.json.gz")
+RATE_LIMIT_STATE = os.path.join(SCRYPTTUNES_DATA_CONFIG, "rate_limits.json")
+DATABASE = os.path.join(SCRYPTTUNES_DATA_CONFIG, "scrypttunes.db")
+REQUEST_LOG = os.path.join(SCRYPTTUNES_DATA_CONFIG, "request_log.jsonl")
+CHANNELS_DIR = os.path.join(SCRYPTTUNES_DATA_CONFIG, "channels")  # one folder per extra channel
+LOG_FILE = os.path.join(SCRYPTTUNES_DATA, "app.log")
+JSON_LOG_FILE = os.path.join(SCRYPTTUNES_DATA, "app.jsonl")
+
+
+def ensure_data_dirs():
+    os.makedirs(SCRYPTTUNES_DATA, exist_ok=True)
+    os.makedirs(SCRYPTTUNES_DATA_CONFIG, exist_ok=True)
 
 
 class Permission(Enum):
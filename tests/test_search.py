@@ -0,0 +1,20 @@
+# Local
+from bot.search import normalize_query
+
+
+def test_reversed_parts_share_a_key():
+    assert normalize_query("Halo - Beyonce") == normalize_query("beyonce – halo")
+
+
+def test_case_accents_and_punctuation_are_ignored():
+    assert normalize_query("Beyoncé - Halo!") == normalize_query("  beyonce   -  HALO ")
+
+
+def test_by_in_a_title_is_not_a_separator():
+    assert normalize_query("Stand by Me") == "stand by me"
+    assert normalize_query("Stand by Me") != normalize_query("Me - Stand")
+    assert normalize_query("Stand by Me - Ben E. King") == normalize_query("Ben E. King - Stand by Me")
+
+
+def test_punctuation_only_queries_keep_distinct_keys():
+    assert normalize_query("???") != normalize_query("!!!")
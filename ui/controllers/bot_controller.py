@@ -2,8 +2,6 @@ import asyncio
 import logging
 import threading
 
-from bot.scrypt_tunes import Bot
-
 
 class BotController:
     def __init__(self, root):
@@ -29,6 +27,10 @@ class BotController:
         self.bot_run_event.clear()
 
     def _run(self):
+        # spotipy, twitchio and aiohttp are only needed once the bot starts, importing them here keeps them
+        # off the GUI's startup path and out of the Tk thread
+        from bot.scrypt_tunes import Bot
+
         asyncio.set_event_loop(self.loop)
         self.bot = self.loop.create_task(Bot().run())
         self.loop.run_forever()
\ No newline at end of file
@@ -5,6 +5,8 @@ import json
 from os import path
 
 import constants
+from bot.persistence import atomic_write
+from bot.config_service import get_config_service
 from ui.models.song_blacklist import SongBlacklist
 from ui.models.user_blacklist import UserBlacklist
 from ui.models.config import Config, PermissionConfig, PermissionSetting
@@ -20,7 +22,7 @@ class SettingsController:
         # ensure song blacklist exists
         if path.exists(constants.SONG_BLACKLIST):
             with open(constants.SONG_BLACKLIST) as f:
-                self.blacklist_model = SongBlacklist(**json.load(f))
+                self.song_blacklist = SongBlacklist(**json.load(f))
         else:
             self.song_blacklist = SongBlacklist()
             self.save_song_blacklist()
@@ -76,19 +78,17 @@ class SettingsController:
 
     def save_config(self):
         try:
-            with open(constants.CONFIG, "w") as f:
-                json.dump(self.config_model.model_dump(), f, indent=4)
+            atomic_write(constants.CONFIG, json.dumps(self.config_model.model_dump(), indent=4))
+            get_config_service().notify()  # running bot picks the change up without a restart
             return True
         except Exception as e:
             return False, str(e)
 
     def save_user_blacklist(self):
-        with open(constants.USER_BLACKLIST, "w") as f:
-            json.dump(self.user_blacklist.model_dump(), f, indent=4)
+        atomic_write(constants.USER_BLACKLIST, json.dumps(self.user_blacklist.model_dump(), indent=4))
 
     def save_song_blacklist(self):
-        with open(constants.SONG_BLACKLIST, "w") as f:
-            json.dump(self.song_blacklist.model_dump(), f, indent=4)
+        atomic_write(constants.SONG_BLACKLIST, json.dumps(self.song_blacklist.model_dump(), indent=4))
 
     def show_general_settings_window(self):
         x_offset, y_offset = map(int, self.root.geometry().split('+')[1:3])
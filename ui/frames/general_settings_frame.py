@@ -45,7 +45,7 @@ class GeneralSettingsFrame(CTkFrame):
         self.rate_limit_row = CheckboxSettingRow(
             self,
             setting_name="Rate Limit",
-            setting_description="Limit song requests to once every 5 minutes",
+            setting_description="Limit how often each chatter can request songs",
             initial_value=settings_controller.get("rate_limit"),
         )
         self.rate_limit_row.grid(row=3, column=0, padx=10, pady=5, sticky="ew")
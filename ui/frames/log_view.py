@@ -0,0 +1,118 @@
+import logging
+from collections import deque
+
+from tkinter import WORD, END
+from customtkinter import CTkFrame, CTkTextbox, CTkOptionMenu, CTkEntry
+
+LEVELS = {"DEBUG": logging.DEBUG, "INFO": logging.INFO, "WARNING": logging.WARNING, "ERROR": logging.ERROR}
+
+
+class CTkTabviewHandler(logging.Handler):
+    """
+    Log handler for the GUI. emit() runs on whatever thread logged (usually the bot's event loop) and only appends
+    the formatted line to a deque, Tk is never touched from there. The LogView drains it on the Tk thread.
+
+    The deque is bounded, so if the GUI falls behind (or is minimized for hours) the oldest lines are dropped
+    instead of piling up in memory.
+    """
+
+    def __init__(self, max_pending: int = 10000):
+        super().__init__()
+        self.pending = deque(maxlen=max_pending)  # (levelno, line), append/popleft are atomic
+        self.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s", "%H:%M:%S"))
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            self.pending.append((record.levelno, self.format(record)))
+        except Exception:
+            self.handleError(record)
+
+    def drain(self, limit: int) -> list:
+        """:return: list: up to `limit` of the oldest pending (levelno, line)"""
+        lines = []
+        for _ in range(min(limit, len(self.pending))):
+            lines.append(self.pending.popleft())
+        return lines
+
+
+class LogView(CTkFrame):
+    """
+    Read-only log textbox fed by a CTkTabviewHandler. Keeps the last `max_lines` entries, newer batches are inserted
+    with one insert per timer tick, and the shown lines can be narrowed by level and by a search string.
+    """
+
+    def __init__(self, master, handler: CTkTabviewHandler, max_lines: int = 2000, interval_ms: int = 100,
+                 batch_size: int = 500):
+        super().__init__(master, fg_color="transparent")
+        self.handler = handler
+        self.interval_ms = interval_ms
+        self.batch_size = batch_size
+
+        self.lines = deque(maxlen=max_lines)  # everything kept, filtered or not
+        self.shown = deque()  # text lines per entry in the textbox, a traceback is one entry over many lines
+        self.min_level = logging.INFO
+        self.search = ""
+
+        self.level_menu = CTkOptionMenu(self, values=list(LEVELS), command=self.set_level, width=110)
+        self.level_menu.set("INFO")
+        self.level_menu.grid(row=0, column=0, padx=(0, 10), pady=(0, 10), sticky="w")
+
+        self.search_entry = CTkEntry(self, placeholder_text="Search log")
+        self.search_entry.bind("<KeyRelease>", lambda event: self.set_search(self.search_entry.get()))
+        self.search_entry.grid(row=0, column=1, pady=(0, 10), sticky="ew")
+
+        self.text = CTkTextbox(self, wrap=WORD, state="disabled")
+        self.text.grid(row=1, column=0, columnspan=2, sticky="nsew")
+
+        self.grid_rowconfigure(1, weight=1)
+        self.grid_columnconfigure(1, weight=1)
+
+        self.after(self.interval_ms, self.pump)
+
+    def matches(self, line) -> bool:
+        levelno, text = line
+        return levelno >= self.min_level and (not self.search or self.search in text.lower())
+
+    def pump(self):
+        """Move pending records into the view, then reschedule. Runs on the Tk thread."""
+        batch = self.handler.drain(self.batch_size)
+        if batch:
+            self.lines.extend(batch)
+            self.append([line for line in batch if self.matches(line)])
+        self.after(self.interval_ms if len(self.handler.pending) < self.batch_size else 1, self.pump)
+
+    def append(self, lines: list):
+        if not lines:
+            return
+        at_bottom = self.text.yview()[1] >= 0.999  # don't yank the view away from someone scrolled up
+
+        self.text.configure(state="normal")
+        self.text.insert(END, "".join(text + "\n" for _, text in lines))
+        self.shown.extend(text.count("\n") + 1 for _, text in lines)
+        excess = 0
+        while len(self.shown) > self.lines.maxlen:
+            excess += self.shown.popleft()
+        if excess:
+            self.text.delete("1.0", f"{excess + 1}.0")
+        self.text.configure(state="disabled")
+
+        if at_bottom:
+            self.text.see(END)
+
+    def redraw(self):
+        self.text.configure(state="normal")
+        self.text.delete("1.0", END)
+        self.text.configure(state="disabled")
+        self.shown.clear()
+        self.append([line for line in self.lines if self.matches(line)])
+        self.text.see(END)
+
+    def set_level(self, level: str):
+        self.min_level = LEVELS[level]
+        self.redraw()
+
+    def set_search(self, search: str):
+        search = search.strip().lower()
+        if search != self.search:
+            self.search = search
+            self.redraw()
@@ -1,12 +1,11 @@
 import logging
-import os
-from logging.handlers import RotatingFileHandler
 
-from rich.logging import RichHandler
 from tkinter import WORD, END
 from customtkinter import CTkFrame, CTkTabview, CTkTextbox
 
-from constants import SCRYPTTUNES_DATA_CONFIG
+from bot.log_pipeline import add_handler
+from bot.request_log import get_request_log
+from ui.frames.log_view import CTkTabviewHandler, LogView
 
 class MainFrame(CTkFrame):
     def __init__(self, master, bot_controller, settings_controller):
@@ -23,37 +22,40 @@ class MainFrame(CTkFrame):
         self.tabview.grid(row=0, column=0, padx=(20, 20), pady=(0, 20), sticky="nsew")
         self.tabview.add("Log")
 
-        self.log_text = CTkTextbox(master=self.tabview.tab("Log"), wrap=WORD)
-        self.log_text.pack(side="top", fill="both", expand=True)
-
-        # Configure logging
-        logger = logging.getLogger()
-        logger.setLevel(logging.INFO)
-
-        gui_handler = CTkTabviewHandler(self.log_text)
-        gui_handler.setLevel(logging.INFO)
-        logger.addHandler(gui_handler)
-    
-        log_file_path = os.path.join(SCRYPTTUNES_DATA_CONFIG, "app.log")
-        file_handler = RotatingFileHandler(
-            log_file_path, mode='a', maxBytes=1*1024*1024, backupCount=1, encoding="utf-8", delay=0
-        )
-        file_handler.setLevel(logging.INFO)
-        file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
-
-class CTkTabviewHandler(RichHandler):
-    def __init__(self, text_widget: CTkTextbox):
-        super().__init__()
-        self.text_widget = text_widget
-
-    def emit(self, record: logging.LogRecord):
-        try:
-            log_message = self.format(record)
-            # Send the log message to the Text widget
-            self.text_widget.insert(END, log_message + "\n")
-            # Automatically scroll to the end to show the latest log message
-            self.text_widget.see(END)
-        except Exception as e:
-            print(f"Error emitting log message: {e}")
\ No newline at end of file
+        gui_handler = CTkTabviewHandler()
+        gui_handler.setLevel(logging.DEBUG)  # the view filters by level itself
+
+        self.log_view = LogView(self.tabview.tab("Log"), gui_handler)
+        self.log_view.pack(side="top", fill="both", expand=True)
+
+        self.tabview.add("Stats")
+        self.stats_text = CTkTextbox(master=self.tabview.tab("Stats"), wrap=WORD)
+        self.stats_text.pack(side="top", fill="both", expand=True)
+        self.refresh_stats()
+
+        # the log view is fed from the logging pipeline's listener thread
+        add_handler(gui_handler)
+
+    def refresh_stats(self):
+        """Redraw the stats tab from the request log's running aggregates, every few seconds."""
+        request_log = get_request_log()
+        summary = request_log.summary()
+        lines = [
+            f"Requests this session: {summary['requests']} ({summary['queued']} queued)",
+        ]
+        if summary["avg_latency_ms"] is not None:
+            lines.append(f"Average time to resolve: {summary['avg_latency_ms']:.0f} ms")
+
+        lines += ["", "Top songs:"]
+        lines += [f"  {count:>3}  {name}" for name, count in request_log.top_songs(10)] or ["  none yet"]
+        lines += ["", "Top requesters:"]
+        lines += [f"  {count:>3}  {user}" for user, count in request_log.top_requesters(10)] or ["  none yet"]
+        lines += ["", "Rejected requests:"]
+        rejections = request_log.rejections()
+        lines += [f"  {count:>3}  {outcome.replace('_', ' ')}" for outcome, count in rejections] or ["  none"]
+
+        self.stats_text.configure(state="normal")
+        self.stats_text.delete("1.0", END)
+        self.stats_text.insert(END, "\n".join(lines))
+        self.stats_text.configure(state="disabled")
+        self.after(5000, self.refresh_stats)
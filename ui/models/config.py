@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List
 
 from pydantic import BaseModel
 
@@ -22,6 +22,36 @@ class PermissionSettingDict(BaseModel):
     songrequest_command: PermissionSetting
 
 
+class RoleRateLimits(BaseModel):
+    """Song requests allowed per window for each role, 0 for unlimited. A chatter gets their most generous role."""
+    unsubbed: int = 1
+    subscriber: int = 1
+    vip: int = 1
+    mod: int = 1
+    broadcaster: int = 0
+
+
+class RateLimitConfig(BaseModel):
+    strategy: str = "sliding_window"  # or "token_bucket"
+    window: int = 300  # seconds
+    persist: bool = False  # keep limiter state across bot restarts
+    limits: RoleRateLimits = RoleRateLimits()
+
+
+class LogConfig(BaseModel):
+    level: str = "INFO"
+    # per subsystem overrides, keyed by logger name ("twitchio", "spotipy") or bot module ("scrypt_tunes")
+    levels: Dict[str, str] = {}
+    json_file: bool = False  # also write app.jsonl, one JSON object per record
+
+
+class AlertConfig(BaseModel):
+    """Error alerts to a Discord webhook, off while webhook_url is empty."""
+    webhook_url: str = ""
+    mention: str = ""  # e.g. "<@user id>" or "<@&role id>", pinged on each alert
+    dedup_window: int = 300  # seconds identical errors are collapsed into one alert plus a count
+
+
 class Config(BaseModel):
     nickname: str = ""
     prefix: str = "!"
@@ -34,7 +64,12 @@ class Config(BaseModel):
     spotify_secret: str = ""
     spotify_redirect_uri: str = "http://localhost:8080"
     rate_limit: int = 0
+    rate_limits: RateLimitConfig = RateLimitConfig()
+    duplicate_request_window: int = 300  # seconds a queued song can't be queued again, 0 to allow duplicates
     welcome_message: str = ""
+    storage: str = "json"  # or "sqlite", read at startup
+    log: LogConfig = LogConfig()
+    alerts: AlertConfig = AlertConfig()
     permissions: PermissionSettingDict = PermissionSettingDict(
         ping_command=PermissionSetting(
             command_name="ping_command",